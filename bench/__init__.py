@@ -0,0 +1 @@
+# bench — pipeline benchmarks over synthetic DPR sheets (python -m bench.pipeline)
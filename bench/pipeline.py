@@ -0,0 +1,200 @@
+# bench/pipeline.py — Stage-by-stage benchmark of the dashboard pipeline
+#
+#   python -m bench.pipeline --rows 10k,100k              # compare to baseline
+#   python -m bench.pipeline --rows 10k,100k,1M --update  # record new baseline
+#
+# Each stage is timed separately (best wall time of --repeat runs) with its
+# peak traced memory, and compared to the JSON baseline. Exits 1 when any
+# stage is slower, or peaks higher, than baseline × (1 + threshold).
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from dpr.aging import compute_aging
+from dpr.cube import KpiCube
+from dpr.exports import iter_export
+from dpr.filters import FILTER_DIMS, FilterIndex, make_selection
+from dpr.grid import GridView
+from dpr.ingest import parse_sheet
+from dpr.kpis import compute_kpis
+from dpr.lifecycle import add_lifecycle
+from dpr.search import SearchIndex
+from dpr.stages import ALL_STAGES, evaluate_stages, stage_frame
+from dpr.synth import make_csv, parse_rows
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.25
+MIN_SLACK = 0.02  # seconds — ignore noise on very fast stages
+MIN_MB_SLACK = 1.0  # MB — ignore noise on small allocations
+PAGE_SIZE = 250
+NOW = pd.Timestamp("2025-12-31")
+
+
+# ───────────────────────────── STAGES ─────────────────────────────
+# Each stage takes the state dict built by the ones before it and returns a
+# dict of values to add to it.
+def st_parse(s):
+    return {"df": parse_sheet(s["csv"])}
+
+
+def st_filter(s):
+    df = s["df"]
+    index = FilterIndex(df, FILTER_DIMS)
+    circles = df["Circle"].cat.categories[:1].tolist()
+    months = df["Month"].cat.categories[:3].tolist()
+    rows = None
+    for chosen in ({"Circle": circles}, {"Circle": circles, "Month": months}, {"Month": months}):
+        rows = index.rows(make_selection(chosen))
+    return {"index": index, "view": df.iloc[rows]}
+
+
+def st_status(s):
+    return {"status": add_lifecycle(s["df"].drop(columns=["Current Status", "Lifecycle Stage"]))}
+
+
+def st_kpis(s):
+    return {"kpis": compute_kpis(s["df"])}
+
+
+def st_pending(s):
+    return {"membership": evaluate_stages(s["df"], ALL_STAGES)}
+
+
+def st_aging(s):
+    return {"aging": compute_aging(s["df"], s["membership"], ALL_STAGES, now=NOW)}
+
+
+def st_cube(s):
+    cube = KpiCube(s["df"], now=NOW)
+    for chosen in ({}, {"Circle": s["df"]["Circle"].cat.categories[:1].tolist()}):
+        selection = make_selection(chosen)
+        cube.kpis_for(selection)
+        cube.aging(selection)
+    return {"cube": cube}
+
+
+def st_search(s):
+    df = s["df"]
+    index = SearchIndex(df)
+    row = len(df) // 3
+    for query in (df["HOP A-B"].iloc[row], str(df["SITE ID A"].iloc[row])[-5:], "LOS", "W"):
+        index.rows(query)
+    return {"search": index}
+
+
+def st_export(s):
+    frame = stage_frame(s["df"], s["membership"].rows("I&C"), list(s["df"].columns))
+    size = sum(len(chunk) for chunk in iter_export(frame, "CSV"))
+    return {"export_bytes": size}
+
+
+def st_display(s):
+    grid = GridView(s["df"])
+    cols = list(s["df"].columns)
+    return {"page": grid.page(cols, 1, PAGE_SIZE, sort_by="HOP AT DATE", ascending=False)}
+
+
+STAGES = [
+    ("parse", st_parse),
+    ("filter", st_filter),
+    ("status", st_status),
+    ("kpis", st_kpis),
+    ("pending", st_pending),
+    ("aging", st_aging),
+    ("cube", st_cube),
+    ("search", st_search),
+    ("export", st_export),
+    ("display", st_display),
+]
+
+
+# ───────────────────────────── RUNNER ─────────────────────────────
+def measure(fn, state, repeat):
+    """Best wall time over `repeat` runs, plus peak traced MB of one extra run."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(state)
+        best = min(best, time.perf_counter() - t0)
+    del out
+    tracemalloc.start()
+    out = fn(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, {"seconds": round(best, 4), "peak_mb": round(peak / 2**20, 1)}
+
+
+def run(rows, repeat, seed=0):
+    state = {"csv": make_csv(rows, seed)}
+    results = {}
+    for name, fn in STAGES:
+        out, results[name] = measure(fn, state, repeat)
+        state.update(out)
+    return results
+
+
+def compare(label, results, baseline, threshold):
+    """Print a table against the baseline; return the names of regressed stages."""
+    regressed = []
+    print(f"\n{label} rows")
+    print(f"  {'stage':<10}{'seconds':>10}{'base':>10}{'peak MB':>10}{'base':>10}")
+    for name, cur in results.items():
+        base = baseline.get(name, {})
+        b_sec, b_mb = base.get("seconds"), base.get("peak_mb")
+        flags = []
+        if b_sec is not None and cur["seconds"] > max(b_sec * (1 + threshold), b_sec + MIN_SLACK):
+            flags.append("slower")
+        if b_mb is not None and cur["peak_mb"] > max(b_mb * (1 + threshold), b_mb + MIN_MB_SLACK):
+            flags.append("more memory")
+        flag = f"  ← {', '.join(flags)}" if flags else ""
+        if flags:
+            regressed.append(f"{label}/{name}")
+        print(f"  {name:<10}{cur['seconds']:>10.4f}{'' if b_sec is None else f'{b_sec:.4f}':>10}"
+              f"{cur['peak_mb']:>10.1f}{'' if b_mb is None else f'{b_mb:.1f}':>10}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DPR dashboard pipeline.")
+    parser.add_argument("--rows", default="10k,100k", help="comma list: 10k,100k,1M,5M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--update", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    recorded = baseline.setdefault("results", {})
+    regressed = []
+    for label in args.rows.split(","):
+        label = label.strip()
+        results = run(parse_rows(label), args.repeat)
+        regressed += compare(label, results, recorded.get(label, {}), args.threshold)
+        if args.update:
+            recorded[label] = results
+
+    if args.update:
+        baseline["machine"] = {"python": platform.python_version(), "pandas": pd.__version__,
+                               "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if regressed:
+        print(f"\nregressed beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,44 @@
 # dashboard.py — FINAL VERSION (DD-MMM-YY Date Format)
+import os
+import time
+import uuid
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
 
+from dpr import charts, metrics
+from dpr.aging import aging_days
+from dpr.cube import KpiCube
+from dpr.exports import EXPORT_FORMATS, ExportCache
+from dpr.filters import make_selection
+from dpr.grid import PAGE_SIZES, GridView, format_dates
+from dpr.kpis import ALERT_KPIS, KPI_LABELS, kpi_list, summary_frame
+from dpr.stages import AGING_STAGES, ALL_STAGES, PENDING_COLS, PENDING_STAGES, evaluate_stages, pending_list, stage_columns
+from dpr.sync import CACHE_DIR
+from dpr.warmup import Warmup
+
+# ───────────────────── WARM-UP ─────────────────────
+# The first script run of a server process (usually the password prompt) starts
+# loading the snapshot and building the dataset and cube in the background; its
+# refresher then re-syncs on a schedule (dpr.refresh)
+@st.cache_resource
+def get_warmup():
+    return Warmup().start()
+
+warmup = get_warmup()
+
 # ───────────────────── PASSWORD PROTECTION ─────────────────────
 def check_password():
     def password_entered():
-        if st.session_state["password"] == "APTGMW2025": # ← CHANGE PASSWORD HERE
+        admin_password = os.environ.get("DPR_ADMIN_PASSWORD")
+        if admin_password and st.session_state["password"] == admin_password:
+            st.session_state["password_correct"] = True
+            st.session_state["is_admin"] = True
+            st.session_state["login_at"] = time.time()
+            del st.session_state["password"]
+        elif st.session_state["password"] == "APTGMW2025": # ← CHANGE PASSWORD HERE
             st.session_state["password_correct"] = True
+            st.session_state["login_at"] = time.time()
             del st.session_state["password"]
         else:
             st.session_state["password_correct"] = False
@@ -30,6 +60,18 @@ if not check_password():
 # ───────────────────── PAGE SETUP ─────────────────────
 st.set_page_config(page_title="AP-TG MW DPR", page_icon="📡", layout="wide")
 
+# ───────────────────── INSTRUMENTATION ─────────────────────
+# Per-session timing spans and cache counters: on for every session with
+# DPR_METRICS=1, or per admin session from the sidebar panel. Runs are written
+# as JSON lines to DPR_METRICS_LOG.
+METRICS_LOG = os.environ.get("DPR_METRICS_LOG", os.path.join(CACHE_DIR, "metrics.jsonl"))
+if "metrics" not in st.session_state:
+    st.session_state.metrics = metrics.Recorder(
+        enabled=os.environ.get("DPR_METRICS", "") not in ("", "0"),
+        log_path=METRICS_LOG, session=uuid.uuid4().hex[:8])
+rec = st.session_state.metrics
+rec.start_run("full")
+
 # ───────────────────── SIDEBAR ─────────────────────
 st.sidebar.title("MW DPR Dashboard")
 st.sidebar.markdown("**Live • Auto-refresh**")
@@ -63,35 +105,130 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # ───────────────────── DATA LOADING & FORMATTING ─────────────────────
-@st.cache_data(ttl=60)
+# Filter-cell cube: KPI / status / stage counts and aging histograms for any sidebar
+# selection without touching hop rows. The refresher publishes one with each dataset;
+# aging days roll over at midnight, so a cube from an earlier day is rebuilt here.
+@st.cache_resource(max_entries=2)
+def get_cube(version, day, _dataset):
+    metrics.miss()
+    return KpiCube(_dataset.frame)
+
+# Trend history: the refresher appends every new version it publishes
+def get_history():
+    return warmup.refresher.history
+
+# One read-only dataset (frame + filter postings) per version, shared by every
+# session — no per-session copies; sessions only hold row views of it. Never syncs
+# on the request path: serves the last dataset and cube the refresher published.
 def load_data():
-    sheet_id = "1BD-Bww-k_3jVwJAGqBbs02YcOoUyNrOWcY_T9xvnbgY"
-    gid = "0"
-    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-    df = pd.read_csv(csv_url)
-   
-    date_cols = df.columns[df.columns.str.contains("Date|DATE", case=False)]
-    for col in date_cols:
-        df[col] = pd.to_datetime(df[col], errors='coerce')
-    return df
-
-# Helper function to format dates as DD-MMM-YY for display
-def format_date_cols(df_in):
-    df_out = df_in.copy()
-    # Iterate through columns and format if datetime
-    for col in df_out.columns:
-        if pd.api.types.is_datetime64_any_dtype(df_out[col]):
-            # Format: 24-Nov-25
-            df_out[col] = df_out[col].dt.strftime('%d-%b-%y')
-    return df_out
+    live = warmup.refresher.get()
+    if live is None:
+        raise RuntimeError(warmup.refresher.status["error"] or "no data loaded")
+    return live.dataset, live.cube
+
+def ago(seconds):
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return "just now"
+    for unit, size in (("d", 86400), ("h", 3600), ("min", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.0f} {unit} ago"
+
+# Filter-keyed computations (KPIs, stages, aging, tables, grids): key starts with the
+# view hash (dataset version + filter selection); _build only runs on a cache miss
+@st.cache_resource(max_entries=128, ttl=600)
+def _view_cache(key, _build):
+    metrics.miss()
+    return _build()
+
+def view_cache(key, build):
+    with rec.span(f"view:{key[1]}", cache=True):
+        return _view_cache(key, build)
+
+# Charts: the figure JSON is cached per view like any other view result, and the
+# Figure is rebuilt from a payload only once per process
+@st.cache_resource(max_entries=256)
+def _figure(payload):
+    import plotly.io as pio  # deferred: plotly loads on the warm-up thread, not before the first page
+
+    return pio.from_json(payload, skip_invalid=True)
+
+def plot(key, build):
+    payload = view_cache((view_key, "chart") + key, lambda: charts.to_json(build()))
+    st.plotly_chart(_figure(payload), use_container_width=True)
+
+# Paginated table: sort and slice server-side, format only the visible page
+def paged_grid(grid, cols, key, sort_by=None, ascending=True, **dataframe_kwargs):
+    sort_options = ["(sheet order)"] + list(cols)
+    c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+    sort_col = c1.selectbox("Sort by", sort_options, key=f"{key}_sort",
+                            index=sort_options.index(sort_by) if sort_by in sort_options else 0)
+    order = c2.selectbox("Order", ["Ascending", "Descending"], index=0 if ascending else 1, key=f"{key}_order")
+    page_size = c3.selectbox("Rows / page", PAGE_SIZES, key=f"{key}_size")
+    page = c4.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+    page = min(int(page), grid.page_count(page_size))
+
+    page_df = grid.page(cols, page, page_size, None if sort_col == sort_options[0] else sort_col, order == "Ascending")
+    st.dataframe(page_df, use_container_width=True, hide_index=True, **dataframe_kwargs)
+    start = (page - 1) * page_size
+    st.caption(f"Rows {start + 1:,}–{start + len(page_df):,} of {len(grid):,} • page {page} of {grid.page_count(page_size)}"
+               if len(grid) else "No rows")
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+# On-demand export: nothing is serialized until the user asks for this file,
+# and a built file is reused for the same view + export + variant + format.
+# Exports with day counts pass the aging day as variant so they roll over at midnight.
+def export_controls(label, key, build_frame, file_stem, variant=None, **button_kwargs):
+    c_fmt, c_btn = st.columns([1, 2])
+    fmt = c_fmt.selectbox("Format", list(EXPORT_FORMATS), key=f"{key}_fmt", label_visibility="collapsed")
+    ext, mime = EXPORT_FORMATS[fmt]
+    cache = get_export_cache()
+    cache_key = (view_key, key, variant, fmt)
+    data = cache.get(cache_key)
+    if data is None and c_btn.button(f"Prepare {label} ({fmt})", key=f"{key}_prep", use_container_width=True):
+        with st.spinner(f"Building {fmt}…"), rec.span(f"export:{key}:{fmt}"):
+            data = cache.build(cache_key, build_frame, fmt)
+    if data is not None:
+        c_btn.download_button(f"{label} ({fmt})", data, f"{file_stem}.{ext}", mime, key=f"{key}_dl",
+                              use_container_width=True, **button_kwargs)
 
 try:
-    df = load_data()
-    st.sidebar.success(f"✅ Data Synced\n{len(df):,} hops loaded")
+    with rec.span("load_data"):
+        dataset, live_cube = load_data()
+    df = dataset.frame
 except Exception as e:
+    # Only when there is no data at all (no snapshot and no successful sync yet)
     st.error("Could not connect to Google Sheet.")
+    rec.finish_run(error=repr(e))
     st.stop()
 
+# Data age and sync state; re-checked every 30 s without rerunning the page
+@st.fragment(run_every=30)
+def sync_status():
+    refresher = warmup.refresher
+    sync = refresher.status
+    live = refresher.live
+    hops = f"{len(df):,} hops • synced {ago(refresher.data_age())}"
+    if sync["ok"] is False:
+        st.warning(f"⚠️ Sync failing ({sync['failures']}×) — showing last good data\n{hops}")
+    elif sync["ok"] is None:
+        st.info(f"⏳ Syncing… showing saved snapshot\n{hops}")
+    else:
+        st.success(f"✅ Data Synced\n{hops}")
+    for name, status in warmup.sources.status.items():
+        if not status["ok"]:
+            kept = f"showing last good copy ({status['rows']:,} hops)" if status["stale"] else "not loaded"
+            st.warning(f"⚠️ {name}: {kept}\n{status['error']}")
+    if live is not None and live.dataset is not dataset:
+        st.caption("Newer data is available — it loads with your next interaction.")
+
+with st.sidebar:
+    sync_status()
+
 # ───────────────────── FILTERS ─────────────────────
 st.sidebar.markdown("### 🔍 Filters")
 
@@ -102,66 +239,46 @@ with c2: selected_month = st.selectbox("Month", ["All"] + sorted(df["Month"].dro
 priority = st.sidebar.multiselect("Priority", ["P0", "P1"], default=["P0", "P1"])
 
 if "Nominal Aop" in df.columns:
-    nominal_options = sorted(df["Nominal Aop"].dropna().astype(str).unique().tolist())
+    nominal_options = sorted(df["Nominal Aop"].dropna().unique().tolist())
     selected_nominal = st.sidebar.multiselect("Nominal Aop", nominal_options)
 else:
     selected_nominal = []
 
 if "Final Remarks" in df.columns:
-    remarks_options = sorted(df["Final Remarks"].dropna().astype(str).unique().tolist())
+    remarks_options = sorted(df["Final Remarks"].dropna().unique().tolist())
     selected_remarks = st.sidebar.multiselect("Final Remarks", remarks_options)
 else:
     selected_remarks = []
 
-# Apply Filters
-filtered = df.copy()
-
-if selected_circle != "All": filtered = filtered[filtered["Circle"] == selected_circle]
-if selected_month != "All": filtered = filtered[filtered["Month"] == selected_month]
-if priority: filtered = filtered[filtered["Priority(P0/P1)"].isin(priority)]
-if selected_nominal: filtered = filtered[filtered["Nominal Aop"].astype(str).isin(selected_nominal)]
-if selected_remarks: filtered = filtered[filtered["Final Remarks"].astype(str).isin(selected_remarks)]
-
-# Status Logic
-def get_status(r):
-    if pd.notna(r.get("PRI OPEN DATE")): return "PRI Open"
-    if pd.notna(r.get("HOP AT DATE")): return "AT Completed"
-    if pd.notna(r.get("ACTUAL HOP RFAI OFFERED DATE")): return "RFAI Offered"
-    if pd.notna(r.get("HOP MATERIAL DELIVERY DATE")): return "Material Delivered"
-    if pd.notna(r.get("HOP MATERIAL DISPATCH DATE")): return "In-Transit"
-    return "Planning"
-filtered["Current Status"] = filtered.apply(get_status, axis=1)
+# Apply Filters — intersect precomputed postings instead of masking a copy
+selection = make_selection({
+    "Circle": [] if selected_circle == "All" else [selected_circle],
+    "Month": [] if selected_month == "All" else [selected_month],
+    "Priority(P0/P1)": priority,
+    "Nominal Aop": selected_nominal,
+    "Final Remarks": selected_remarks,
+})
+with rec.span("filters"):
+    view = dataset.view(selection)
+view_key = view.key
+
+with rec.span("cube", cache=True):
+    today = datetime.now().date()
+    cube = live_cube if live_cube.now.date() == today else get_cube(dataset.version, today, dataset)
+# Milestone KPIs — summed from cube cells, shared by the summary page and the main grid
+kpis = cube.kpis_for(selection)
 
 # ───────────────────── SUMMARY PAGE ─────────────────────
 if st.session_state.get("show_summary", False):
     st.title("MW DPR Milestone Summary Report")
     st.markdown(f"**Generated:** {datetime.now().strftime('%d %b %y • %H:%M')}")
    
-    total_scope = len(filtered) if len(filtered) > 0 else 1
-    rfa_i_offered = len(filtered[~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()])
-    pri_count = len(filtered[filtered["RFI Status"].astype(str).str.strip() == "PRI"])
-    ccrfai_count = len(filtered[filtered["RFI Status"].astype(str).str.strip() == "CCRFAI"])
-   
-    kpi_data = [
-        ("Scope", len(filtered)), ("LB", len(filtered[~filtered["PLAN ID"].isna()])),
-        ("SR", len(filtered[~filtered["HOP SR Date"].isna()])), ("RFAI", rfa_i_offered),
-        ("Survey", len(filtered[~filtered["Survey Date"].isna()])), ("PRI", pri_count),
-        ("CRFAI", rfa_i_offered - pri_count),
-        ("Media", len(filtered[(~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()) & (~filtered["Media Date"].isna())])),
-        ("CCRFAI", ccrfai_count), ("MO", len(filtered[~filtered["HOP MO DATE"].isna()])),
-        ("Mat. Disp.", len(filtered[~filtered["HOP MATERIAL DISPATCH DATE"].isna()])),
-        ("MOS", len(filtered[~filtered["HOP MATERIAL DELIVERY DATE"].isna()])),
-        ("I&C", len(filtered[~filtered["HOP I&C DATE"].isna()])),
-        ("Alignment", len(filtered[~filtered["Alignment Date"].isna()])),
-        ("NMS Done", len(filtered[filtered["VISIBLE IN NMS"].astype(str).str.contains("YES|Yes|yes", na=False)])),
-        ("Phy AT Offer", len(filtered[~filtered["PHY-AT OFFER DATE"].isna()])),
-        ("Soft AT Offer", len(filtered[~filtered["SOFT AT OFFER DATE"].isna()])),
-        ("Phy AT Acc", len(filtered[~filtered["PHY-AT ACCEPTANCE DATE"].isna()])),
-        ("Soft AT Acc", len(filtered[~filtered["SOFT AT ACCEPTANCE DATE"].isna()])),
-        ("HOP AT Done", len(filtered[~filtered["HOP AT DATE"].isna()]))
-    ]
-    summary_df = pd.DataFrame([{"Milestone": l, "Count": v, "%": f"{v/total_scope*100:.2f}%"} for l, v in kpi_data])
+    summary_df = summary_frame(kpis["total"])
     st.dataframe(summary_df, use_container_width=True, hide_index=True)
+    for dim in ("Circle", "Month"):
+        if dim in kpis:
+            with st.expander(f"Milestones by {dim}"):
+                st.dataframe(kpis[dim], use_container_width=True)
    
     col1, col2 = st.columns(2)
     with col1:
@@ -171,56 +288,56 @@ if st.session_state.get("show_summary", False):
         if st.button("Back to Dashboard", use_container_width=True):
             st.session_state.show_summary = False
             st.rerun()
+    rec.finish_run(page="summary", rows=len(df), view_rows=len(view))
     st.stop()
 
 # ───────────────────── MAIN DASHBOARD UI ─────────────────────
-st.markdown("### MW DPR Milestone Progress")
-
-total_scope = len(filtered) if len(filtered) > 0 else 1
-rfa_i_offered = len(filtered[~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()])
-pri_count = len(filtered[filtered["RFI Status"].astype(str).str.strip() == "PRI"])
-ccrfai_count = len(filtered[filtered["RFI Status"].astype(str).str.strip() == "CCRFAI"])
-
-kpi_data = [
-    ("Scope", len(filtered)), ("LB", len(filtered[~filtered["PLAN ID"].isna()])),
-    ("SR", len(filtered[~filtered["HOP SR Date"].isna()])), ("RFAI", rfa_i_offered),
-    ("Survey", len(filtered[~filtered["Survey Date"].isna()])), ("PRI", pri_count),
-    ("CRFAI", rfa_i_offered - pri_count),
-    ("Media", len(filtered[(~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()) & (~filtered["Media Date"].isna())])),
-    ("CCRFAI", ccrfai_count), ("MO", len(filtered[~filtered["HOP MO DATE"].isna()])),
-    ("Mat. Disp.", len(filtered[~filtered["HOP MATERIAL DISPATCH DATE"].isna()])),
-    ("MOS", len(filtered[~filtered["HOP MATERIAL DELIVERY DATE"].isna()])),
-    ("I&C", len(filtered[~filtered["HOP I&C DATE"].isna()])),
-    ("Alignment", len(filtered[~filtered["Alignment Date"].isna()])),
-    ("NMS Done", len(filtered[filtered["VISIBLE IN NMS"].astype(str).str.contains("YES|Yes|yes", na=False)])),
-    ("Phy AT Offer", len(filtered[~filtered["PHY-AT OFFER DATE"].isna()])),
-    ("Soft AT Offer", len(filtered[~filtered["SOFT AT OFFER DATE"].isna()])),
-    ("Phy AT Acc", len(filtered[~filtered["PHY-AT ACCEPTANCE DATE"].isna()])),
-    ("Soft AT Acc", len(filtered[~filtered["SOFT AT ACCEPTANCE DATE"].isna()])),
-    ("HOP AT Done", len(filtered[~filtered["HOP AT DATE"].isna()]))
-]
-
-# RESPONSIVE GRID (5 Columns)
-rows = [kpi_data[i:i+5] for i in range(0, len(kpi_data), 5)]
-
-for row in rows:
-    cols = st.columns(5)
-    for i, (label, value) in enumerate(row):
-        with cols[i]:
-            pct = f"{value/total_scope*100:.1f}%" if total_scope > 0 else "0.0%"
-            accent = "#ef4444" if label in ["PRI", "CCRFAI"] else "#00d4ff"
-            st.markdown(f"""
-            <div class="kpi-box" style="border-left: 4px solid {accent};">
-                <h3 class="kpi-value" style="color: {accent}">{value}</h3>
-                <p class="kpi-label">{label}</p>
-                <div class="kpi-pct">{pct}</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-if st.button("Open Full Summary Report", use_container_width=True, type="primary"):
-    st.session_state.show_summary = True
-    st.rerun()
-
+# Each section below is a fragment: its own widgets rerun only that section,
+# on top of the cube counts and aging computed here.
+stage_reached = cube.stage_counts(selection, "reached")
+stage_done = cube.stage_counts(selection, "done")
+stage_pending = cube.stage_counts(selection, "pending")
+# Percentiles, buckets and by-Circle stats; same reference time as the cube
+aging = cube.aging(selection)
+
+# Row-level stage membership and days-since — only built when a hop table needs them
+# (built from only the rule / date columns of the view's rows, never the full-width view)
+def view_stages():
+    return view_cache((view_key, "stages"), lambda: evaluate_stages(view.take(stage_columns(ALL_STAGES)), ALL_STAGES))
+
+def view_days():
+    return view_cache((view_key, "aging days", cube.now), lambda: aging_days(view.take(stage_columns(ALL_STAGES)), ALL_STAGES, cube.now))
+
+@st.fragment
+@rec.section("kpi_section")
+def kpi_section():
+    st.markdown("### MW DPR Milestone Progress")
+
+    total_scope = len(view) if len(view) > 0 else 1
+    kpi_data = kpi_list(kpis["total"])
+
+    # RESPONSIVE GRID (5 Columns)
+    kpi_rows = [kpi_data[i:i+5] for i in range(0, len(kpi_data), 5)]
+
+    for row in kpi_rows:
+        cols = st.columns(5)
+        for i, (label, value) in enumerate(row):
+            with cols[i]:
+                pct = f"{value/total_scope*100:.1f}%" if total_scope > 0 else "0.0%"
+                accent = "#ef4444" if label in ALERT_KPIS else "#00d4ff"
+                st.markdown(f"""
+                <div class="kpi-box" style="border-left: 4px solid {accent};">
+                    <h3 class="kpi-value" style="color: {accent}">{value}</h3>
+                    <p class="kpi-label">{label}</p>
+                    <div class="kpi-pct">{pct}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+    if st.button("Open Full Summary Report", use_container_width=True, type="primary"):
+        st.session_state.show_summary = True
+        st.rerun()
+
+kpi_section()
 st.markdown("---")
 
 # ───────────────────── AGING ANALYSIS ─────────────────────
@@ -232,309 +349,272 @@ tab1, tab2, tab3, tab4 = st.tabs([
     "Aging Summary"
 ])
 
-# Helper function
-def calc_aging(df, date_col):
-    if df.empty or date_col not in df.columns:
-        return pd.Series([0] * len(df))
-    dates = pd.to_datetime(df[date_col], errors='coerce')
-    return (pd.Timestamp.now() - dates).dt.days
-
-# Initialize empty for summary
-ms1_pending = pd.DataFrame()
-ms2_pending = pd.DataFrame()
-end_to_end = pd.DataFrame()
-
-with tab1:
-    st.markdown("#### RFAI → MS1 (Integration) Aging")
-   
-    rfai_done = filtered[~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()].copy()
-    ms1_done = rfai_done[~rfai_done["INTEGRATION DATE"].isna()].copy()
-    ms1_pending = rfai_done[rfai_done["INTEGRATION DATE"].isna()].copy()
-   
-    # Add aging only to pending
-    if not ms1_pending.empty:
-        ms1_pending["RFAI Date"] = pd.to_datetime(ms1_pending["ACTUAL HOP RFAI OFFERED DATE"]).dt.strftime("%d-%b-%y")
-        ms1_pending["Aging Days"] = calc_aging(ms1_pending, "ACTUAL HOP RFAI OFFERED DATE")
-        ms1_pending = ms1_pending.copy()
-
-    col1, col2, col3 = st.columns(3)
-    with col1: st.metric("RFAI Offered", len(rfai_done))
-    with col2: st.metric("MS1 Completed", len(ms1_done))
-    with col3: st.metric("MS1 Pending", len(ms1_pending))
-    
-    col1, col2 = st.columns(2)
-    show_comp = col1.button("Show Completed", key="t1c", use_container_width=True)
-    show_pend = col2.button("Show Pending", key="t1p", use_container_width=True)
-    
-    if show_comp or not show_pend:
-        st.markdown("##### Completed MS1")
-        if not ms1_done.empty:
-            ms1_done_disp = ms1_done[["Circle", "HOP A-B", "SITE ID A", "SITE ID B"]].copy()
-            ms1_done_disp["RFAI Date"] = pd.to_datetime(ms1_done["ACTUAL HOP RFAI OFFERED DATE"]).dt.strftime("%d-%b-%y")
-            ms1_done_disp["MS1 Date"] = pd.to_datetime(ms1_done["INTEGRATION DATE"]).dt.strftime("%d-%b-%y")
-            ms1_done_disp["Processing Days"] = calc_aging(ms1_done, "ACTUAL HOP RFAI OFFERED DATE")
-            ms1_done_disp["CIRCLE_REMARK_1"] = ms1_done["CIRCLE_REMARK_1"]
-            st.dataframe(ms1_done_disp.sort_values("Processing Days", ascending=False), use_container_width=True, hide_index=True)
-    
-    if show_pend or not show_comp:
-        st.markdown("##### Pending MS1")
-        if not ms1_pending.empty:
-            pending_disp = ms1_pending[["Circle", "HOP A-B", "SITE ID A", "SITE ID B", "RFAI Date", "Aging Days", "CIRCLE_REMARK_1"]]
-            # Use display formatting for all cols
-            st.dataframe(pending_disp.sort_values("Aging Days", ascending=False), use_container_width=True, hide_index=True)
-            st.bar_chart(pending_disp["Aging Days"].value_counts().sort_index())
-            st.download_button("Download Pending List", pending_disp.to_csv(index=False).encode(),
-                               f"RFAI_to_MS1_Pending_{datetime.now().strftime('%d%b')}.csv", "text/csv", use_container_width=True, key="d1")
-        else:
-            st.success("All RFAI hops have completed MS1")
+HOP_COLS = ["Circle", "HOP A-B", "SITE ID A", "SITE ID B"]
+RFAI_DATE = {"RFAI Date": "ACTUAL HOP RFAI OFFERED DATE"}
+
+# What each milestone aging tab shows; stage rules live in dpr.stages.AGING_STAGES
+AGING_TABS = [
+    {"stage": "RFAI → MS1", "title": "RFAI → MS1 (Integration) Aging", "key": "t1", "download": "d1",
+     "metrics": ["RFAI Offered", "MS1 Completed", "MS1 Pending"],
+     "headers": ["##### Completed MS1", "##### Pending MS1"],
+     "done_dates": {**RFAI_DATE, "MS1 Date": "INTEGRATION DATE"}, "done_days": "Processing Days",
+     "pending_dates": RFAI_DATE, "pending_days": "Aging Days",
+     "all_done": "All RFAI hops have completed MS1", "file": "RFAI_to_MS1_Pending"},
+    {"stage": "MS1 → MS2", "title": "MS1 → MS2 (HOP AT) Aging", "key": "t2", "download": "d2",
+     "metrics": ["MS1 Done", "MS2 Done", "MS2 Pending"],
+     "headers": ["##### Completed MS2", "##### Pending MS2"],
+     "done_dates": {"MS1 Date": "INTEGRATION DATE", "HOP AT Date": "HOP AT DATE"}, "done_days": "Processing Days",
+     "pending_dates": {"MS1 Date": "INTEGRATION DATE"}, "pending_days": "Aging Days",
+     "all_done": "All MS1 hops have completed HOP AT", "file": "MS1_to_MS2_Pending"},
+    # "HOP AT Done" here counts every hop with HOP AT, RFAI or not
+    {"stage": "RFAI → MS2", "title": "RFAI → MS2 (End-to-End) Aging", "key": "t3", "download": "d3",
+     "metrics": ["RFAI Offered", "HOP AT Done", "Pending"], "done_kpi": "HOP AT Done",
+     "headers": [None, None],
+     "done_dates": {**RFAI_DATE, "HOP AT Date": "HOP AT DATE"}, "done_days": "Total Days",
+     "pending_dates": RFAI_DATE, "pending_days": "Total Aging",
+     "all_done": "All RFAI hops have completed HOP AT", "file": "RFAI_to_HOPAT_Pending"},
+]
 
-with tab2:
-    st.markdown("#### MS1 → MS2 (HOP AT) Aging")
-   
-    ms1_done = filtered[~filtered["INTEGRATION DATE"].isna()].copy()
-    ms2_done = ms1_done[~ms1_done["HOP AT DATE"].isna()].copy()
-    ms2_pending = ms1_done[ms1_done["HOP AT DATE"].isna()].copy()
-   
-    if not ms2_pending.empty:
-        ms2_pending["MS1 Date"] = pd.to_datetime(ms2_pending["INTEGRATION DATE"]).dt.strftime("%d-%b-%y")
-        ms2_pending["Aging Days"] = calc_aging(ms2_pending, "INTEGRATION DATE")
-        ms2_pending = ms2_pending.copy()
-    
+# Aging distribution of one stage in fixed buckets (bar count independent of data spread)
+def bucket_chart(stage_name):
+    plot((stage_name, cube.now), lambda: charts.bucket_bar(aging["buckets"], stage_name))
+
+# Display table for one stage state: hop ids, formatted dates, day count, remark
+def aging_table(rows, dates, days_label, base_col):
+    src = view.take(HOP_COLS + list(dates.values()) + ["CIRCLE_REMARK_1"], rows)
+    table = {c: src[c] for c in HOP_COLS}
+    for label, col in dates.items():
+        table[label] = format_dates(src[col])
+    table[days_label] = view_days()[base_col][rows]
+    table["CIRCLE_REMARK_1"] = src["CIRCLE_REMARK_1"]
+    return pd.DataFrame(table).sort_values(days_label, ascending=False)
+
+def stage_table(spec, state):
+    name = spec["stage"]
+    base_col = next(s["aging_base"] for s in AGING_STAGES if s["name"] == name)
+    return view_cache((view_key, "aging table", name, state, cube.now), lambda: aging_table(
+        view_stages().rows(name, state), spec[f"{state}_dates"], spec[f"{state}_days"], base_col))
+
+@st.fragment
+@rec.section(lambda spec: f"aging:{spec['stage']}")
+def aging_tab(spec):
+    name = spec["stage"]
+    st.markdown(f"#### {spec['title']}")
+
+    done_count = int(kpis["total"][spec["done_kpi"]]) if "done_kpi" in spec else stage_done[name]
     col1, col2, col3 = st.columns(3)
-    with col1: st.metric("MS1 Done", len(ms1_done))
-    with col2: st.metric("MS2 Done", len(ms2_done))
-    with col3: st.metric("MS2 Pending", len(ms2_pending))
+    with col1: st.metric(spec["metrics"][0], stage_reached[name])
+    with col2: st.metric(spec["metrics"][1], done_count)
+    with col3: st.metric(spec["metrics"][2], stage_pending[name])
     
     col1, col2 = st.columns(2)
-    show_comp = col1.button("Show Completed", key="t2c", use_container_width=True)
-    show_pend = col2.button("Show Pending", key="t2p", use_container_width=True)
+    show_comp = col1.button("Show Completed", key=f"{spec['key']}c", use_container_width=True)
+    show_pend = col2.button("Show Pending", key=f"{spec['key']}p", use_container_width=True)
+    done_header, pending_header = spec["headers"]
     
     if show_comp or not show_pend:
-        st.markdown("##### Completed MS2")
-        if not ms2_done.empty:
-            ms2_done_disp = ms2_done[["Circle", "HOP A-B", "SITE ID A", "SITE ID B"]].copy()
-            ms2_done_disp["MS1 Date"] = pd.to_datetime(ms2_done["INTEGRATION DATE"]).dt.strftime("%d-%b-%y")
-            ms2_done_disp["HOP AT Date"] = pd.to_datetime(ms2_done["HOP AT DATE"]).dt.strftime("%d-%b-%y")
-            ms2_done_disp["Processing Days"] = calc_aging(ms2_done, "INTEGRATION DATE")
-            ms2_done_disp["CIRCLE_REMARK_1"] = ms2_done["CIRCLE_REMARK_1"]
-            st.dataframe(ms2_done_disp.sort_values("Processing Days", ascending=False), use_container_width=True, hide_index=True)
+        if done_header:
+            st.markdown(done_header)
+        done = stage_table(spec, "done")
+        if not done.empty:
+            st.dataframe(done, use_container_width=True, hide_index=True)
     
     if show_pend or not show_comp:
-        st.markdown("##### Pending MS2")
-        if not ms2_pending.empty:
-            pending_disp = ms2_pending[["Circle", "HOP A-B", "SITE ID A", "SITE ID B", "MS1 Date", "Aging Days", "CIRCLE_REMARK_1"]]
-            st.dataframe(pending_disp.sort_values("Aging Days", ascending=False), use_container_width=True, hide_index=True)
-            st.bar_chart(pending_disp["Aging Days"].value_counts().sort_index())
-            st.download_button("Download Pending List", pending_disp.to_csv(index=False).encode(),
-                               f"MS1_to_MS2_Pending_{datetime.now().strftime('%d%b')}.csv", "text/csv", use_container_width=True, key="d2")
+        if pending_header:
+            st.markdown(pending_header)
+        pending = stage_table(spec, "pending")
+        if not pending.empty:
+            st.dataframe(pending, use_container_width=True, hide_index=True)
+            bucket_chart(name)
+            export_controls("Download Pending List", spec["download"], lambda: pending,
+                            f"{spec['file']}_{datetime.now().strftime('%d%b')}", variant=cube.now.date())
         else:
-            st.success("All MS1 hops have completed HOP AT")
+            st.success(spec["all_done"])
 
-with tab3:
-    st.markdown("#### RFAI → MS2 (End-to-End) Aging")
-   
-    end_to_end = filtered[(~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()) & (filtered["HOP AT DATE"].isna())].copy()
-   
-    if not end_to_end.empty:
-        end_to_end["RFAI Date"] = pd.to_datetime(end_to_end["ACTUAL HOP RFAI OFFERED DATE"]).dt.strftime("%d-%b-%y")
-        end_to_end["Total Aging"] = calc_aging(end_to_end, "ACTUAL HOP RFAI OFFERED DATE")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1: st.metric("RFAI Offered", len(filtered[~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()]))
-    with col2: st.metric("HOP AT Done", len(filtered[~filtered["HOP AT DATE"].isna()]))
-    with col3: st.metric("Pending", len(end_to_end))
-    
-    col1, col2 = st.columns(2)
-    show_comp = col1.button("Show Completed", key="t3c", use_container_width=True)
-    show_pend = col2.button("Show Pending", key="t3p", use_container_width=True)
-    
-    if show_comp or not show_pend:
-        completed = filtered[(~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()) & (~filtered["HOP AT DATE"].isna())]
-        if not completed.empty:
-            comp_disp = completed[["Circle", "HOP A-B", "SITE ID A", "SITE ID B"]].copy()
-            comp_disp["RFAI Date"] = pd.to_datetime(completed["ACTUAL HOP RFAI OFFERED DATE"]).dt.strftime("%d-%b-%y")
-            comp_disp["HOP AT Date"] = pd.to_datetime(completed["HOP AT DATE"]).dt.strftime("%d-%b-%y")
-            comp_disp["Total Days"] = calc_aging(completed, "ACTUAL HOP RFAI OFFERED DATE")
-            comp_disp["CIRCLE_REMARK_1"] = completed["CIRCLE_REMARK_1"]
-            st.dataframe(comp_disp.sort_values("Total Days", ascending=False), use_container_width=True, hide_index=True)
-    
-    if show_pend or not show_comp:
-        if not end_to_end.empty:
-            pend_disp = end_to_end[["Circle", "HOP A-B", "SITE ID A", "SITE ID B", "RFAI Date", "Total Aging", "CIRCLE_REMARK_1"]]
-            st.dataframe(pend_disp.sort_values("Total Aging", ascending=False), use_container_width=True, hide_index=True)
-            st.bar_chart(pend_disp["Total Aging"].value_counts().sort_index())
-            st.download_button("Download Pending List", pend_disp.to_csv(index=False).encode(),
-                               f"RFAI_to_HOPAT_Pending_{datetime.now().strftime('%d%b')}.csv", "text/csv", use_container_width=True, key="d3")
-        else:
-            st.success("All RFAI hops have completed HOP AT")
+for tab, spec in zip([tab1, tab2, tab3], AGING_TABS):
+    with tab:
+        aging_tab(spec)
 
-with tab4:
+with tab4, rec.span("aging_summary"):
     st.markdown("#### Aging Summary Report")
    
-    summary = {
-        "Stage": ["RFAI → MS1", "MS1 → MS2", "RFAI → MS2"],
-        "Pending": [len(ms1_pending), len(ms2_pending), len(end_to_end)],
-        "Max Aging": [
-            int(ms1_pending["Aging Days"].max()) if not ms1_pending.empty and "Aging Days" in ms1_pending.columns else 0,
-            int(ms2_pending["Aging Days"].max()) if not ms2_pending.empty and "Aging Days" in ms2_pending.columns else 0,
-            int(end_to_end["Total Aging"].max()) if not end_to_end.empty and "Total Aging" in end_to_end.columns else 0
-        ],
-        "Avg Aging": [
-            f"{ms1_pending['Aging Days'].mean():.1f}" if not ms1_pending.empty and "Aging Days" in ms1_pending.columns else "0",
-            f"{ms2_pending['Aging Days'].mean():.1f}" if not ms2_pending.empty and "Aging Days" in ms2_pending.columns else "0",
-            f"{end_to_end['Total Aging'].mean():.1f}" if not end_to_end.empty and "Total Aging" in end_to_end.columns else "0"
-        ]
-    }
+    aging_stage_names = [stage["name"] for stage in AGING_STAGES]
+    summary = aging["summary"].loc[aging_stage_names].reset_index()
+    summary["Avg Aging"] = summary["Avg Aging"].map(lambda v: f"{v:.1f}" if v else "0")
    
-    st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
-    st.download_button("Download Summary", pd.DataFrame(summary).to_csv(index=False).encode(),
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+    st.download_button("Download Summary", summary.to_csv(index=False).encode(),
                        f"APTG_MW_Aging_Summary_{datetime.now().strftime('%d%b%Y')}.csv", "text/csv", use_container_width=True)
 
+    st.markdown("##### Aging Buckets (days)")
+    st.dataframe(aging["buckets"].loc[aging_stage_names], use_container_width=True)
+    with st.expander("Aging by Circle"):
+        by_circle = aging["by_circle"]
+        st.dataframe(by_circle[by_circle.index.get_level_values("Stage").isin(aging_stage_names)].round(1),
+                     use_container_width=True)
+
 # ───────────────────── FULL SEARCHABLE DATA ─────────────────────
 st.markdown("---")
-st.markdown("### Full Hop Data")
-default_cols = [
-    "Circle", "Month", "HOP A-B", "SITE ID A", "SITE ID B",
-    "Priority(P0/P1)", "Current Status", "RFI Status", "CIRCLE_REMARK_1", "Final Remarks"
-]
-selected_cols = st.multiselect("Select columns", filtered.columns.tolist(), default=default_cols)
-if selected_cols:
-    # Apply date formatting before display
-    display_df = format_date_cols(filtered[selected_cols])
-    
-    st.dataframe(
-        display_df,
-        use_container_width=True,
-        height=600,
-        column_config={
-            col: st.column_config.Column(width="medium") for col in selected_cols
-        },
-        hide_index=True
-    )
-   
-    st.download_button(
-        "Download Data CSV",
-        display_df.to_csv(index=False).encode(),
-        f"APTG_Data.csv", "text/csv",
-        use_container_width=True,
-        type="primary"
-    )
+
+@st.fragment
+@rec.section("full_data")
+def full_data_section():
+    st.markdown("### Full Hop Data")
+    default_cols = [
+        "Circle", "Month", "HOP A-B", "SITE ID A", "SITE ID B",
+        "Priority(P0/P1)", "Current Status", "RFI Status", "CIRCLE_REMARK_1", "Final Remarks"
+    ]
+    # Search within the filtered hops (dpr.search index, built at sync time)
+    query = st.text_input("Search", key="full_search", placeholder="🔎 HOP A-B, site ID, plan ID or remark")
+    with rec.span("search"):
+        hits = dataset.view(selection, query) if query.strip() else view
+    if hits is not view:
+        st.caption(f"{len(hits):,} of {len(view):,} hops match “{query.strip()}”")
+    selected_cols = st.multiselect("Select columns", df.columns.tolist(), default=default_cols)
+    if selected_cols:
+        full_grid = view_cache((hits.key, "grid", "Full Hop Data"), lambda: GridView(dataset.frame, hits.rows))
+        paged_grid(
+            full_grid, selected_cols, "full",
+            height=600,
+            column_config={
+                col: st.column_config.Column(width="medium") for col in selected_cols
+            }
+        )
+       
+        export_controls("Download Data", "full", lambda: hits.take(selected_cols), "APTG_Data",
+                        variant=(tuple(selected_cols), hits.query), type="primary")
+
+full_data_section()
 
 # ───────────────────── PENDING HOPS TRACKER (REVISED DAX LOGIC) ─────────────────────
 st.markdown("---")
 st.markdown("### Pending Hops")
 
-# Helper to calculate aging days safely
-def get_aging(df, start_col):
-    if df.empty or start_col not in df.columns:
-        return 0
-    return (pd.Timestamp.now() - pd.to_datetime(df[start_col], errors='coerce')).dt.days
-
-# 1. Survey Pending
-survey_pend = filtered[
-    (~filtered["ACTUAL HOP RFAI OFFERED DATE"].isna()) & 
-    (~filtered["Media Date"].isna()) & 
-    (filtered["Survey Date"].isna())
-].copy()
-
-# 2. MO Pending
-mo_pend = filtered[
-    (~filtered["Survey Date"].isna()) & 
-    (filtered["HOP MO DATE"].isna()) & 
-    (filtered["RFI Status"].astype(str).str.strip().str.lower() != "pending")
-].copy()
-
-# 3. I&C Pending
-ic_pend = filtered[
-    (~filtered["HOP MATERIAL DELIVERY DATE"].isna()) & 
-    (filtered["HOP I&C DATE"].isna())
-].copy()
-
-# 4. MS1 Pending
-ms1_pend = filtered[
-    (~filtered["HOP I&C DATE"].isna()) & 
-    (filtered["Alignment Date"].isna())
-].copy()
-
-# 5. Phy AT Pending
-phy_pend = filtered[
-    (~filtered["HOP I&C DATE"].isna()) & 
-    (filtered["PHY-AT ACCEPTANCE DATE"].isna())
-].copy()
-
-# 6. Soft AT Pending
-soft_pend = filtered[
-    (~filtered["Alignment Date"].isna()) & 
-    (filtered["SOFT AT ACCEPTANCE DATE"].isna())
-].copy()
-
 # ─── TABS LAYOUT ───
-t1, t2, t3, t4, t5, t6 = st.tabs([
-    f"Survey ({len(survey_pend)})", 
-    f"MO ({len(mo_pend)})", 
-    f"I&C ({len(ic_pend)})", 
-    f"MS1 ({len(ms1_pend)})", 
-    f"Phy AT ({len(phy_pend)})", 
-    f"Soft AT ({len(soft_pend)})"
-])
+pending_tabs = st.tabs([f"{stage['name']} ({stage_pending[stage['name']]})" for stage in PENDING_STAGES])
+
+# Pending list of one stage: hop ids, remark, aging base date and days pending
+def pending_frame(stage):
+    return pending_list(view.take(PENDING_COLS + [stage["aging_base"]]), view_stages(), stage, view_days())
 
 # Function to render each tab uniformly
-def render_pending_tab(tab, df, name, aging_base_col):
-    with tab:
-        col_head, col_dl = st.columns([3, 1])
-        with col_head:
-            st.markdown(f"#### 📉 {name} Pending List")
+@st.fragment
+@rec.section(lambda stage: f"pending:{stage['name']}")
+def pending_tab(stage):
+    name = stage["name"]
+    col_head, col_dl = st.columns([2, 2])
+    with col_head:
+        st.markdown(f"#### 📉 {name} Pending List")
+    
+    if stage_pending[name]:
+        tab_grid = view_cache((view_key, "grid", name, cube.now), lambda: GridView(pending_frame(stage)))
         
-        if not df.empty:
-            # Calculate Aging based on the specific DAX logic prerequisite
-            df["Days Pending"] = get_aging(df, aging_base_col)
-            
-            # Select columns to display
-            base_cols = ["Circle", "HOP A-B", "SITE ID A", "SITE ID B", "CIRCLE_REMARK_1", aging_base_col, "Days Pending"]
-            # Filter only columns that actually exist in the dataframe
-            show_cols = [c for c in base_cols if c in df.columns]
-            
-            # Format Dates in display DF
-            display_tab_df = format_date_cols(df[show_cols])
-            
-            # Display Table
-            st.dataframe(
-                display_tab_df.sort_values("Days Pending", ascending=False),
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            # Download Button
-            with col_dl:
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=display_tab_df.to_csv(index=False).encode(),
-                    file_name=f"{name.replace(' ', '_')}_Pending.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
-        else:
-            st.success(f"✅ Great job! No hops pending in {name}.")
+        # Display Table (one formatted page, oldest first)
+        paged_grid(tab_grid, tab_grid.df.columns.tolist(), f"pend_{name}", sort_by="Days Pending", ascending=False)
+        
+        # Download Button
+        with col_dl:
+            export_controls("📥 Download", f"pend_{name}_dl", lambda: tab_grid.df, f"{name.replace(' ', '_')}_Pending",
+                            variant=cube.now.date())
+    else:
+        st.success(f"✅ Great job! No hops pending in {name}.")
 
 # ─── RENDER TABS ───
-render_pending_tab(t1, survey_pend, "Survey", "ACTUAL HOP RFAI OFFERED DATE")
-render_pending_tab(t2, mo_pend, "MO", "Survey Date")
-render_pending_tab(t3, ic_pend, "I&C", "HOP MATERIAL DELIVERY DATE")
-render_pending_tab(t4, ms1_pend, "MS1", "HOP I&C DATE")
-render_pending_tab(t5, phy_pend, "Phy AT", "HOP I&C DATE")
-render_pending_tab(t6, soft_pend, "Soft AT", "Alignment Date")
+for tab, stage in zip(pending_tabs, PENDING_STAGES):
+    with tab:
+        pending_tab(stage)
 
 # ───────────────────── CHARTS ─────────────────────
 st.markdown("---")
-col1, col2 = st.columns(2)
-with col1:
-    fig = px.pie(filtered["Current Status"].value_counts().reset_index(), names="Current Status", values="count",
-                 title="Current Status", hole=0.5)
-    st.plotly_chart(fig, use_container_width=True)
-with col2:
-    fig2 = px.bar(filtered["Circle"].value_counts().reset_index(), x="Circle", y="count", title="Hops by Circle")
-    st.plotly_chart(fig2, use_container_width=True)
+
+@st.fragment
+@rec.section("charts")
+def charts_section():
+    col1, col2 = st.columns(2)
+    with col1:
+        plot(("status",), lambda: charts.status_pie(cube, selection))
+    with col2:
+        plot(("circle",), lambda: charts.circle_bar(cube, selection))
+
+charts_section()
+
+# ───────────────────── MILESTONE TRENDS ─────────────────────
+st.markdown("---")
+
+TREND_MILESTONES = ["RFAI", "I&C", "HOP AT Done"]
+
+@st.fragment
+@rec.section("trends")
+def trends_section():
+    st.markdown("### Milestone Trends")
+    c1, c2 = st.columns([3, 1])
+    milestones = c1.multiselect("Milestones", KPI_LABELS[1:], default=TREND_MILESTONES, key="trend_ms")
+    period = c2.selectbox("Velocity per", ["Week", "Day"], key="trend_freq")
+    if not milestones:
+        return
+    circles = None if selected_circle == "All" else [selected_circle]
+    history = get_history()
+    burnup = history.burnup(milestones, circles)
+    if burnup.empty:
+        st.info("No history yet — trends build up from each data sync.")
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### Burn-up (hops reached)")
+        st.line_chart(burnup)
+    with col2:
+        st.markdown(f"##### Velocity (hops per {period.lower()})")
+        st.bar_chart(history.velocity(milestones, circles, freq=period[0]))
+    st.caption("Follows the Circle filter; other filters do not apply to history.")
+
+trends_section()
 
 # ───────────────────── FOOTER ─────────────────────
 st.markdown("---")
 st.markdown(f"<p style='text-align:center; color:{sub_text};'>Last refreshed: {datetime.now().strftime('%d %b %y • %H:%M')}</p>", unsafe_allow_html=True)
+
+# Time to first render: from login for this session, from warm-up start for the process
+first_render = {}
+if "first_render_s" not in st.session_state:
+    st.session_state.first_render_s = time.time() - st.session_state.get("login_at", warmup.started_at)
+    first_render = {"first_render_ms": round(st.session_state.first_render_s * 1000),
+                    "process_first_render_ms": round(warmup.mark_render() * 1000)}
+
+# ───────────────────── PERFORMANCE PANEL (ADMIN) ─────────────────────
+if rec.enabled:
+    rec.finish_run(rows=len(df), view_rows=len(view), dataset_number=dataset.number,
+                   dataset_mb=round(metrics.frame_mb(df, ("dataset", dataset.version)), 1),
+                   view_mb=round(view.nbytes / 2**20, 3), **first_render)
+
+if st.session_state.get("is_admin"):
+    with st.sidebar.expander("⏱ Performance (admin)"):
+        rec.enabled = st.toggle("Record timings", value=rec.enabled, key="metrics_on")
+        last = next((r for r in reversed(rec.runs) if r["kind"] == "full"), None)
+        if last is None:
+            st.caption("No runs recorded yet — turn on recording and interact with the dashboard.")
+        else:
+            c1, c2 = st.columns(2)
+            c1.metric("Last rerun", f"{last['total_ms']:,.0f} ms")
+            c2.metric("RSS", f"{last['rss_mb']:,.0f} MB")
+            c1.metric("Dataset", f"{last.get('dataset_mb', 0):,.1f} MB")
+            c2.metric("View index", f"{last.get('view_mb', 0):,.2f} MB")
+            st.markdown("**Sections (last rerun)**")
+            st.dataframe(pd.DataFrame([{"Section": "  " * s["depth"] + s["name"], "ms": s.get("ms"),
+                                        "Cache": s.get("cache", "")} for s in last["spans"]]),
+                         hide_index=True, use_container_width=True)
+            st.markdown("**Cache hits / misses (session)**")
+            st.dataframe(pd.DataFrame(rec.cache_table()), hide_index=True, use_container_width=True)
+            st.markdown("**Recent reruns**")
+            st.dataframe(pd.DataFrame([{"Time": datetime.fromtimestamp(r["ts"]).strftime("%H:%M:%S"), "Kind": r["kind"],
+                                        "Total ms": r["total_ms"],
+                                        "Slowest": max(r["spans"], key=lambda s: s.get("ms", 0))["name"] if r["spans"] else ""}
+                                       for r in reversed(rec.runs)]),
+                         hide_index=True, use_container_width=True)
+            st.caption(f"Log: {METRICS_LOG}")
+        st.markdown("**Cold start**")
+        c1, c2 = st.columns(2)
+        c1.metric("First render (session)", f"{st.session_state.first_render_s * 1000:,.0f} ms")
+        c2.metric("First render (process)", f"{warmup.first_render * 1000:,.0f} ms")
+        st.dataframe(pd.DataFrame([{"Warm-up step": step, "s": seconds, "Error": warmup.errors.get(step, "")}
+                                   for step, seconds in warmup.timings.items()]),
+                     hide_index=True, use_container_width=True)
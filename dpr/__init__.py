@@ -0,0 +1 @@
+# dpr — data engines behind the MW DPR dashboard (no Streamlit imports here)
@@ -0,0 +1,88 @@
+# dpr/aging.py — Aging analytics engine (one reference time, int64 day math)
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400_000_000_000
+NAT = np.iinfo(np.int64).min  # datetime64 NaT viewed as int64
+NAT_DAYS = NAT                # days value returned for rows whose base date is empty
+
+# Label → lower bound in days; "60+" means 61 days and older
+BUCKETS = [("0-7", 0), ("8-15", 8), ("16-30", 16), ("31-60", 31), ("60+", 61)]
+BUCKET_LABELS = [label for label, _ in BUCKETS]
+_BUCKET_EDGES = np.array([low for _, low in BUCKETS[1:]])
+
+STAT_COLS = ["Pending", "P50", "P90", "P99", "Max Aging", "Avg Aging"]
+
+
+def days_since(df, col, now):
+    """Whole days from each date in df[col] to now (floored, like Timedelta.days); NaT → NAT_DAYS.
+
+    A missing column ages as 0, matching the old calc_aging() fallback.
+    """
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    ns = df[col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    days = (now.value - ns) // NS_PER_DAY
+    days[ns == NAT] = NAT_DAYS
+    return days
+
+
+def bucket_counts(days, weights=None):
+    """Hop counts per BUCKETS entry (future dates count as 0-7); weights = hops per days value."""
+    idx = np.searchsorted(_BUCKET_EDGES, days, side="right")
+    if weights is None:
+        return np.bincount(idx, minlength=len(BUCKETS))
+    return np.bincount(idx, weights=weights, minlength=len(BUCKETS)).astype(np.int64)
+
+
+def aging_stats(days):
+    if len(days) == 0:
+        return dict(zip(STAT_COLS, [0, 0, 0, 0, 0, 0.0]))
+    p50, p90, p99 = np.percentile(days, [50, 90, 99]).round(1).tolist()
+    return dict(zip(STAT_COLS, [len(days), p50, p90, p99, int(days.max()), float(days.mean())]))
+
+
+def aging_days(df, stages, now):
+    """Days-since per distinct aging base column of the stages: {base column: int64 array}."""
+    days = {}
+    for stage in stages:
+        col = stage["aging_base"]
+        if col not in days:
+            days[col] = days_since(df, col, now)
+    return days
+
+
+def compute_aging(df, membership, stages, now=None):
+    """Aging of the pending hops of every stage against a single reference time.
+
+    Days-since is computed once per aging base column and shared by all stages
+    on that base. Returns a dict with:
+      now        — the reference Timestamp
+      days       — {base column: int64 days-since array, aligned with df rows}
+      summary    — stage × STAT_COLS
+      by_circle  — (stage, circle) × STAT_COLS
+      buckets    — stage × BUCKET_LABELS hop counts
+    """
+    now = now if now is not None else pd.Timestamp.now()
+    days = aging_days(df, stages, now)
+
+    circle = df["Circle"] if "Circle" in df.columns else None
+    summary, by_circle, buckets = [], [], []
+    for stage in stages:
+        name = stage["name"]
+        rows = membership.rows(name)
+        d = days[stage["aging_base"]][rows]
+        summary.append({"Stage": name, **aging_stats(d)})
+        buckets.append(bucket_counts(d))
+        if circle is not None and len(d):
+            keys = circle.iloc[rows].to_numpy()
+            for key, part in pd.Series(d).groupby(keys, sort=True):
+                by_circle.append({"Stage": name, "Circle": key, **aging_stats(part.to_numpy())})
+
+    return {
+        "now": now,
+        "days": days,
+        "summary": pd.DataFrame(summary, columns=["Stage"] + STAT_COLS).set_index("Stage"),
+        "by_circle": pd.DataFrame(by_circle, columns=["Stage", "Circle"] + STAT_COLS).set_index(["Stage", "Circle"]),
+        "buckets": pd.DataFrame(buckets, index=[s["name"] for s in stages], columns=BUCKET_LABELS),
+    }
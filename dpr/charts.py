@@ -0,0 +1,60 @@
+# dpr/charts.py — Pre-aggregated, size-capped chart payloads (Plotly figure JSON)
+#
+# Charts are built from counts the cube already holds (statuses, circles, aging
+# buckets), never from hop rows, and every series is capped: past MAX_POINTS
+# the smallest values are folded into one "Other" point. A payload therefore
+# has the same size for 10k or 5M hops and can be cached as a JSON string
+# under the view hash (dataset version + filter selection).
+import json
+
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 12
+OTHER = "Other"
+
+
+def cap(counts, max_points=MAX_POINTS):
+    """Largest max_points - 1 values as-is, the rest summed into OTHER (counts sorted descending)."""
+    if len(counts) <= max_points:
+        return counts
+    head = counts.iloc[:max_points - 1]
+    rest = counts.iloc[max_points - 1:].sum()
+    return pd.concat([pd.Series(head.to_numpy(), index=head.index.astype(str)), pd.Series([rest], index=[OTHER])])
+
+
+def _values(counts):
+    return [str(v) for v in counts.index], np.asarray(counts, dtype=np.int64).tolist()
+
+
+def pie(counts, title, hole=0.5):
+    labels, values = _values(cap(counts))
+    return {"data": [{"type": "pie", "labels": labels, "values": values, "hole": hole}],
+            "layout": {"title": {"text": title}}}
+
+
+def bar(counts, title=None, x_title=None, y_title="count", max_points=MAX_POINTS):
+    labels, values = _values(cap(counts, max_points))
+    layout = {"xaxis": {"title": {"text": x_title or counts.index.name}, "type": "category"},
+              "yaxis": {"title": {"text": y_title}}, "barmode": "relative"}
+    if title:
+        layout["title"] = {"text": title}
+    return {"data": [{"type": "bar", "x": labels, "y": values}], "layout": layout}
+
+
+def status_pie(cube, selection):
+    return pie(cube.value_counts("Current Status", selection), "Current Status")
+
+
+def circle_bar(cube, selection):
+    return bar(cube.value_counts("Circle", selection), "Hops by Circle", "Circle")
+
+
+def bucket_bar(buckets, stage_name):
+    """Aging buckets of one stage — fixed bins, so one bar per bucket whatever the spread of days."""
+    counts = buckets.loc[stage_name]
+    return bar(counts, x_title="Aging (days)", y_title="Hops", max_points=len(counts))
+
+
+def to_json(figure):
+    return json.dumps(figure, separators=(",", ":"))
@@ -0,0 +1,191 @@
+# dpr/cube.py — Pre-aggregated KPI / stage / aging cube over the sidebar filter dimensions
+import numpy as np
+import pandas as pd
+
+from dpr.aging import BUCKET_LABELS, STAT_COLS, aging_days, bucket_counts
+from dpr.filters import FILTER_DIMS
+from dpr.kpis import KPI_LABELS, kpi_matrix
+from dpr.lru import LRU
+from dpr.stages import ALL_STAGES, evaluate_stages
+
+STATES = ("reached", "done", "pending")
+
+
+def _cell_sums(cell, n_cells, matrix):
+    """Per-cell column sums of a hop × k boolean matrix → n_cells × k int64."""
+    out = np.zeros((n_cells, matrix.shape[1]), dtype=np.int64)
+    for j in range(matrix.shape[1]):
+        out[:, j] = np.bincount(cell[matrix[:, j]], minlength=n_cells)
+    return out
+
+
+def collapse(days, counts):
+    """Merge (days, hops) histogram entries into sorted distinct days with summed hops."""
+    if len(days) == 0:
+        return days, counts
+    low = days.min()
+    if days.max() - low > 100_000:  # sparse (e.g. a blank base date) — sort instead
+        distinct, inverse = np.unique(days, return_inverse=True)
+        return distinct, np.bincount(inverse, weights=counts).astype(np.int64)
+    dense = np.bincount(days - low, weights=counts).astype(np.int64)
+    distinct = np.flatnonzero(dense)
+    return distinct + low, dense[distinct]
+
+
+def weighted_percentiles(values, weights, qs):
+    """np.percentile (linear) of sorted `values` repeated `weights` times, without expanding them."""
+    v, c = values, np.cumsum(weights)
+    out = []
+    for q in qs:
+        pos = q / 100 * (c[-1] - 1)
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        v_lo, v_hi = v[np.searchsorted(c, lo, side="right")], v[np.searchsorted(c, hi, side="right")]
+        out.append(v_lo + (v_hi - v_lo) * (pos - lo))
+    return out
+
+
+def hist_stats(days, counts):
+    """aging_stats() of a day histogram (days + hop counts, any order, repeats allowed)."""
+    days, counts = collapse(days, counts)
+    n = int(counts.sum())
+    if n == 0:
+        return dict(zip(STAT_COLS, [0, 0, 0, 0, 0, 0.0]))
+    p50, p90, p99 = np.round(weighted_percentiles(days, counts, [50, 90, 99]), 1).tolist()
+    return dict(zip(STAT_COLS, [n, p50, p90, p99, int(days.max()), float((days * counts).sum() / n)]))
+
+
+class KpiCube:
+    """Milestone counts, status / stage counts and aging histograms per filter cell.
+
+    A cell is one combination of the filter dimension values (blank is a value
+    of its own). Built once per dataset version and day; a sidebar selection is
+    answered by masking cells and summing them, so query cost follows the cell
+    count, not the hop count. Aging is kept as per-cell (day → hops)
+    histograms of pending hops, which give exact counts, maxima, means,
+    buckets and percentiles for any set of cells.
+    """
+
+    def __init__(self, df, stages=ALL_STAGES, now=None, dims=FILTER_DIMS, cache_size=64):
+        self.now = now if now is not None else pd.Timestamp.now()
+        self.stages = stages
+        self.dims = [d for d in dims if d in df.columns]
+        self.categories = {d: df[d].cat.categories for d in self.dims}
+
+        # Mixed-radix cell key from categorical codes (code + 1 so blank = 0)
+        key = np.zeros(len(df), dtype=np.int64)
+        for d in self.dims:
+            key = key * (len(self.categories[d]) + 1) + (df[d].cat.codes.to_numpy().astype(np.int64) + 1)
+        cell_keys, cell = np.unique(key, return_inverse=True)
+        self.n_cells = len(cell_keys)
+        self.cell_codes = {}
+        for d in reversed(self.dims):
+            base = len(self.categories[d]) + 1
+            self.cell_codes[d] = cell_keys % base - 1  # -1 = blank
+            cell_keys = cell_keys // base
+
+        matrix = kpi_matrix(df)
+        self.kpi_labels = list(matrix.columns)
+        self.kpis = _cell_sums(cell, self.n_cells, matrix.to_numpy())
+
+        status = df["Current Status"]
+        self.status_labels = status.cat.categories
+        self.status = np.bincount(cell * len(self.status_labels) + status.cat.codes.to_numpy(),
+                                  minlength=self.n_cells * len(self.status_labels)
+                                  ).reshape(self.n_cells, len(self.status_labels))
+
+        membership = evaluate_stages(df, stages)
+        self.stage_names = membership.names
+        self.stage_counts_ = {which: _cell_sums(cell, self.n_cells, getattr(membership, which)) for which in STATES}
+
+        # Pending-hop aging: per stage, (cell, day, hops) entries sorted by cell
+        days = aging_days(df, stages, self.now)
+        self.hist = {}
+        for i, stage in enumerate(stages):
+            rows = membership.pending[:, i]
+            d = days[stage["aging_base"]][rows]
+            c = cell[rows]
+            pair, counts = np.unique(np.stack([c, d]), axis=1, return_counts=True)
+            self.hist[stage["name"]] = (pair[0], pair[1], counts)
+
+        self._cache = LRU(cache_size)
+
+    # ── selection ──
+    def mask(self, selection):
+        """Boolean mask over cells for a make_selection() key (same semantics as FilterIndex)."""
+        return self._cache.get_or_build(selection, lambda: self._mask(selection))
+
+    def _mask(self, selection):
+        mask = np.ones(self.n_cells, dtype=bool)
+        for dim, values in selection:
+            if dim not in self.cell_codes:
+                continue
+            cats = self.categories[dim]
+            wanted = cats.get_indexer(pd.Index(values).astype(cats.dtype, copy=False)) if len(cats) else []
+            mask &= np.isin(self.cell_codes[dim], [w for w in wanted if w >= 0])
+        return mask
+
+    def _by(self, dim, mask, values):
+        """Sum per value of dim over the selected cells; only values present (like groupby observed=True)."""
+        codes = self.cell_codes[dim][mask]
+        keep = codes >= 0
+        n = len(self.categories[dim])
+        sums = np.zeros((n, values.shape[1]), dtype=np.int64)
+        np.add.at(sums, codes[keep], values[mask][keep])
+        present = np.bincount(codes[keep], weights=self.kpis[mask][keep, 0], minlength=n) > 0
+        return pd.DataFrame(sums[present], index=pd.Index(self.categories[dim][present], name=dim))
+
+    # ── queries ──
+    def size(self, selection):
+        return int(self.kpis[self.mask(selection), 0].sum())
+
+    def kpis_for(self, selection, by=("Circle", "Month")):
+        """Same result shape as compute_kpis() for the selected rows."""
+        mask = self.mask(selection)
+        total = pd.Series(self.kpis[mask].sum(axis=0), index=self.kpi_labels)
+        total["CRFAI"] = total["RFAI"] - total["PRI"]
+        result = {"total": total.reindex(KPI_LABELS).astype(int)}
+        for dim in by:
+            if dim in self.cell_codes:
+                grouped = self._by(dim, mask, self.kpis)
+                grouped.columns = self.kpi_labels
+                grouped["CRFAI"] = grouped["RFAI"] - grouped["PRI"]
+                result[dim] = grouped[KPI_LABELS].astype(int)
+        return result
+
+    def stage_counts(self, selection, which="pending"):
+        return dict(zip(self.stage_names, self.stage_counts_[which][self.mask(selection)].sum(axis=0).tolist()))
+
+    def value_counts(self, col, selection):
+        """Hop counts per Current Status or per filter dimension value, largest first (zeros dropped)."""
+        mask = self.mask(selection)
+        if col == "Current Status":
+            counts = pd.Series(self.status[mask].sum(axis=0), index=pd.CategoricalIndex(self.status_labels, name=col))
+        else:
+            by = self._by(col, mask, self.kpis[:, :1])
+            counts = pd.Series(by[0].to_numpy(), index=by.index)
+        counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+        return counts.rename("count")
+
+    def aging(self, selection):
+        """compute_aging() summary / by_circle / buckets for the selected rows (no per-row days)."""
+        mask = self.mask(selection)
+        circle_codes = self.cell_codes.get("Circle")
+        summary, by_circle, buckets = [], [], []
+        for name in self.stage_names:
+            cells, days, counts = self.hist[name]
+            keep = mask[cells]
+            cells, days, counts = cells[keep], days[keep], counts[keep]
+            summary.append({"Stage": name, **hist_stats(days, counts)})
+            buckets.append(bucket_counts(days, counts))
+            if circle_codes is not None:
+                circ = circle_codes[cells]
+                for code in np.flatnonzero(np.bincount(circ[circ >= 0], minlength=len(self.categories["Circle"]))):
+                    part = circ == code
+                    by_circle.append({"Stage": name, "Circle": self.categories["Circle"][code],
+                                      **hist_stats(days[part], counts[part])})
+        return {
+            "now": self.now,
+            "summary": pd.DataFrame(summary, columns=["Stage"] + STAT_COLS).set_index("Stage"),
+            "by_circle": pd.DataFrame(by_circle, columns=["Stage", "Circle"] + STAT_COLS).set_index(["Stage", "Circle"]),
+            "buckets": pd.DataFrame(buckets, index=self.stage_names, columns=BUCKET_LABELS),
+        }
@@ -0,0 +1,88 @@
+# dpr/dataset.py — One shared, read-only dataset per process; sessions hold row views
+import itertools
+import threading
+import time
+
+import numpy as np
+
+from dpr.filters import FilterIndex, view_hash
+from dpr.search import SearchIndex
+
+_numbers = itertools.count(1)
+
+
+class Dataset:
+    """A synced frame plus its filter index, shared by every session.
+
+    `version` is the content hash (stable across restarts, used in cache keys);
+    `number` counts the datasets this process has loaded. Text columns are
+    Arrow-backed strings (see schema.TEXT_DTYPE). The search index is built on
+    first use; the refresher builds it right after publishing a dataset.
+    Nothing writes to `frame`: sessions read it through `View.take`, which
+    returns new frames.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.version = frame.attrs.get("version")
+        self.number = next(_numbers)
+        self.loaded_at = time.time()
+        self.index = FilterIndex(frame)
+        self._search = None
+        self._search_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def search(self):
+        with self._search_lock:
+            if self._search is None:
+                self._search = SearchIndex(self.frame)
+        return self._search
+
+    def view(self, selection, query=""):
+        return View(self, selection, query)
+
+
+class View:
+    """The rows of a dataset matching one filter selection (and search query).
+
+    Holds only row positions (shared with the filter / search index LRUs);
+    `take` reads the columns a caller needs for those rows off the dataset.
+    """
+
+    __slots__ = ("dataset", "selection", "query", "rows", "key")
+
+    def __init__(self, dataset, selection, query=""):
+        self.dataset = dataset
+        self.selection = selection
+        self.query = query.strip().upper()
+        self.rows = dataset.index.rows(selection)  # None → every row
+        if self.query:
+            found = dataset.search.rows(self.query)
+            if self.rows is not None and len(self.rows):
+                # both sorted: binary-search each hit in the filtered rows
+                pos = np.searchsorted(self.rows, found).clip(max=len(self.rows) - 1)
+                found = found[self.rows[pos] == found]
+            elif self.rows is not None:
+                found = self.rows  # nothing passes the filters
+            self.rows = found
+        self.key = view_hash(dataset.version, (selection, self.query) if self.query else selection)
+
+    def __len__(self):
+        return len(self.dataset) if self.rows is None else len(self.rows)
+
+    @property
+    def nbytes(self):
+        return 0 if self.rows is None else self.rows.nbytes
+
+    def take(self, cols, rows=None):
+        """Only the given columns (those present) of the view's rows, or of `rows` positions within the view."""
+        base = self.dataset.frame
+        cols = base.columns.get_indexer([c for c in cols if c in base.columns])
+        if rows is None:
+            rows = slice(None) if self.rows is None else self.rows
+        elif self.rows is not None:
+            rows = self.rows[rows]
+        return base.iloc[rows, cols]
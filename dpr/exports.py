@@ -0,0 +1,134 @@
+# dpr/exports.py — On-demand, chunked CSV / Parquet / XLSX exports
+import io
+
+from dpr.grid import format_date_cols
+from dpr.lru import LRU
+
+CHUNK_ROWS = 50_000
+
+# Format → (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+class _Sink(io.RawIOBase):
+    """Write-only byte sink that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.parts = []
+        self.pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.pos
+
+    def drain(self):
+        out = b"".join(self.parts)
+        self.parts = []
+        return out
+
+
+def iter_csv(df, chunk_rows=CHUNK_ROWS):
+    # Dates as DD-MMM-YY, formatted chunk by chunk
+    for i, chunk in enumerate(_chunks(df, chunk_rows)):
+        yield format_date_cols(chunk).to_csv(index=False, header=(i == 0)).encode()
+
+
+def iter_parquet(df, chunk_rows=CHUNK_ROWS):
+    # Typed columns, one row group per chunk
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Sink()
+    writer = None
+    for chunk in _chunks(df, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False, schema=writer.schema if writer else None)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _xlsx_sheet(wb, name, df, chunk_rows):
+    ws = wb.create_sheet(name[:31])
+    ws.append([str(c) for c in df.columns])
+    for chunk in _chunks(df, chunk_rows):
+        chunk = format_date_cols(chunk).astype(object)
+        for row in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+            ws.append(row)
+
+
+def iter_xlsx(df, chunk_rows=CHUNK_ROWS, sheet_name="Data"):
+    # openpyxl write-only mode streams rows to a temp file; the zip is produced at save
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    _xlsx_sheet(wb, sheet_name, df, chunk_rows)
+    buf = io.BytesIO()
+    wb.save(buf)
+    yield buf.getvalue()
+
+
+_WRITERS = {"CSV": iter_csv, "XLSX": iter_xlsx, "Parquet": iter_parquet}
+
+
+def iter_export(df, fmt, chunk_rows=CHUNK_ROWS):
+    """Yield the file for df in the given EXPORT_FORMATS format, chunk by chunk."""
+    return _WRITERS[fmt](df, chunk_rows)
+
+
+def write_export(df, fmt, path, chunk_rows=CHUNK_ROWS):
+    """Stream an export straight to disk."""
+    with open(path, "wb") as f:
+        for part in iter_export(df, fmt, chunk_rows):
+            f.write(part)
+    return path
+
+
+def write_workbook(sheets, fmt, stem, chunk_rows=CHUNK_ROWS):
+    """Write {sheet name: frame} as one XLSX workbook, or one CSV / Parquet file per sheet.
+
+    Returns the paths written; stem is the output path without extension.
+    """
+    if fmt == "XLSX":
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        for name, df in sheets.items():
+            _xlsx_sheet(wb, name, df, chunk_rows)
+        path = f"{stem}.xlsx"
+        wb.save(path)
+        return [path]
+    ext = EXPORT_FORMATS[fmt][0]
+    return [write_export(df, fmt, f"{stem} - {name}.{ext}", chunk_rows) for name, df in sheets.items()]
+
+
+class ExportCache:
+    """Built export files keyed by (view hash, export name, format), LRU-bounded by total bytes."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self._files = LRU(max_size=max_bytes)
+
+    def get(self, key):
+        return self._files.get(key)
+
+    def build(self, key, build_frame, fmt):
+        """Return the cached file for key, building it from build_frame() only on a miss."""
+        return self._files.get_or_build(key, lambda: b"".join(iter_export(build_frame(), fmt)))
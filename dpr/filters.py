@@ -0,0 +1,62 @@
+# dpr/filters.py — Precomputed sidebar filter index
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from dpr.lru import LRU
+
+FILTER_DIMS = ["Circle", "Month", "Priority(P0/P1)", "Nominal Aop", "Final Remarks"]
+
+
+def make_selection(chosen):
+    """Canonical, hashable filter key ((dim, (values...)), ...) from {dim: [values]}; empty dims are dropped."""
+    return tuple((dim, tuple(sorted(map(str, chosen[dim])))) for dim in FILTER_DIMS if chosen.get(dim))
+
+
+def view_hash(version, selection):
+    """Short stable hash of a dataset version + filter selection (cache keys, file names)."""
+    return hashlib.sha1(repr((version, selection)).encode()).hexdigest()[:12]
+
+
+class FilterIndex:
+    """Value → sorted row-position postings for each filter dimension.
+
+    Built once per dataset version. rows(selection) unions the postings of the
+    chosen values within a dimension and intersects across dimensions; results
+    are memoized per selection with LRU eviction.
+    """
+
+    def __init__(self, df, dims=FILTER_DIMS, cache_size=32):
+        self.n = len(df)
+        self.postings = {}
+        for dim in dims:
+            if dim in df.columns:
+                self.postings[dim] = self._build(df[dim])
+        self._cache = LRU(cache_size)
+
+    @staticmethod
+    def _build(s):
+        if not isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype("category")
+        codes = s.cat.codes.to_numpy()
+        order = np.argsort(codes, kind="stable").astype(np.int32)  # stable → each posting stays sorted
+        bounds = np.cumsum(np.bincount(codes + 1, minlength=len(s.cat.categories) + 1))
+        postings = np.split(order, bounds[:-1])[1:]  # [0] is the NaN group
+        return {str(cat): rows for cat, rows in zip(s.cat.categories, postings)}
+
+    def rows(self, selection):
+        """Sorted row positions matching the selection, or None when nothing is filtered."""
+        return self._cache.get_or_build(selection, lambda: self._rows(selection))
+
+    def _rows(self, selection):
+        result = None
+        for dim, values in selection:
+            postings = self.postings.get(dim)
+            if postings is None:
+                continue
+            parts = [postings[v] for v in values if v in postings]
+            # postings of one dimension are disjoint → concat + sort is their union
+            hit = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+            result = hit if result is None else np.intersect1d(result, hit, assume_unique=True)
+        return result
@@ -0,0 +1,74 @@
+# dpr/grid.py — Server-side sorted, paginated, lazily formatted table views
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%d-%b-%y"  # 24-Nov-25
+PAGE_SIZES = [100, 250, 500, 1000]
+
+
+def format_dates(s):
+    """strftime each distinct date once (dates repeat heavily across hops); NaT stays missing."""
+    codes, uniques = pd.factorize(s)
+    labels = np.append(uniques.strftime(DATE_FORMAT).to_numpy(dtype=object), np.nan)
+    return pd.Series(labels[codes], index=s.index, name=s.name)  # code -1 → trailing NaN
+
+
+# Helper function to format dates as DD-MMM-YY for display
+def format_date_cols(df_in):
+    df_out = df_in.copy()
+    # Iterate through columns and format if datetime
+    for col in df_out.columns:
+        if pd.api.types.is_datetime64_any_dtype(df_out[col]):
+            df_out[col] = format_dates(df_out[col])
+    return df_out
+
+
+class GridView:
+    """A frame, or some of its rows, served one page at a time.
+
+    `rows` are positions into `df` (None → every row), so a filtered view is
+    paged straight off the shared frame without copying it. Sort orders are
+    computed once per (column, direction) and kept; only the rows of the
+    requested page are taken and date-formatted.
+    """
+
+    def __init__(self, df, rows=None):
+        self.df = df
+        self.rows = rows
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df) if self.rows is None else len(self.rows)
+
+    def page_count(self, page_size):
+        return max(1, math.ceil(len(self) / page_size))
+
+    def order(self, col, ascending=True):
+        """Positions within the view sorted by col (stable, blanks last), cached per column."""
+        key = (col, ascending)
+        with self._lock:
+            if key in self._orders:
+                return self._orders[key]
+        s = self.df[col] if self.rows is None else self.df[col].iloc[self.rows]
+        order = s.reset_index(drop=True).sort_values(ascending=ascending, kind="stable",
+                                                     na_position="last").index.to_numpy()
+        with self._lock:
+            self._orders[key] = order
+        return order
+
+    def page(self, cols, page=1, page_size=PAGE_SIZES[0], sort_by=None, ascending=True):
+        """Formatted rows of one page (1-based) for the given columns."""
+        start = (page - 1) * page_size
+        stop = min(start + page_size, len(self))
+        if sort_by is not None and sort_by in self.df.columns:
+            rows = self.order(sort_by, ascending)[start:stop]
+        else:
+            rows = np.arange(start, stop)
+        if self.rows is not None:
+            rows = self.rows[rows]
+        cols = [c for c in cols if c in self.df.columns]
+        return format_date_cols(self.df.iloc[rows, self.df.columns.get_indexer(cols)])
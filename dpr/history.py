@@ -0,0 +1,171 @@
+# dpr/history.py — Append-only snapshot history with daily milestone aggregates
+#
+#   <cache_dir>/history/history.sqlite        snapshots + daily aggregate tables
+#   <cache_dir>/history/day=YYYY-MM-DD/*.parquet   one file per dataset version
+#
+# Every new dataset version adds one snapshot file and replaces that day's row
+# per (milestone, Circle) in `daily`, so burn-up and velocity charts read a
+# table of days × milestones × circles instead of rescanning snapshots.
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from dpr.kpis import KPI_DEFS, KPI_LABELS, compute_kpis
+from dpr.sync import CACHE_DIR
+
+BLANK_CIRCLE = "(blank)"
+# Milestones with a completion date: used to backfill burn-up before the first snapshot
+DATED_KPIS = {label: col for label, kind, col in KPI_DEFS if kind == "notna" and "DATE" in col.upper()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    version TEXT PRIMARY KEY, day TEXT, recorded_at REAL, rows INTEGER, path TEXT);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT, milestone TEXT, circle TEXT, reached INTEGER, source TEXT,
+    PRIMARY KEY (day, milestone, circle));
+"""
+
+
+def circle_counts(df):
+    """Milestone counts per Circle (blank circles grouped as BLANK_CIRCLE): DataFrame[circle × KPI]."""
+    counts = compute_kpis(df, by=("Circle",))
+    by_circle = counts.get("Circle", pd.DataFrame(columns=KPI_LABELS))
+    blank = counts["total"] - by_circle.sum()
+    if blank.any():
+        by_circle = pd.concat([by_circle, blank.to_frame(BLANK_CIRCLE).T])
+    by_circle.index = by_circle.index.astype(str)
+    return by_circle
+
+
+def dated_burnup(df):
+    """Cumulative hops per (day, milestone, circle) from the milestone dates themselves."""
+    circle = (df["Circle"].astype(str).where(df["Circle"].notna(), BLANK_CIRCLE)
+              if "Circle" in df.columns else pd.Series(BLANK_CIRCLE, index=df.index))
+    parts = []
+    for label, col in DATED_KPIS.items():
+        if col not in df.columns:
+            continue
+        days = df[col].dt.normalize()
+        per_day = (pd.DataFrame({"day": days, "circle": circle}).dropna()
+                   .groupby(["circle", "day"]).size())
+        if per_day.empty:
+            continue
+        burnup = per_day.groupby(level="circle").cumsum().rename("reached").reset_index()
+        burnup["milestone"] = label
+        parts.append(burnup)
+    if not parts:
+        return pd.DataFrame(columns=["day", "milestone", "circle", "reached"])
+    out = pd.concat(parts, ignore_index=True)
+    out["day"] = out["day"].dt.strftime("%Y-%m-%d")
+    return out
+
+
+class HistoryStore:
+    """Append-only history of dataset versions plus per-day milestone aggregates."""
+
+    def __init__(self, cache_dir=CACHE_DIR, keep_snapshots=True):
+        self.root = os.path.join(cache_dir, "history")
+        self.db_path = os.path.join(self.root, "history.sqlite")
+        self.keep_snapshots = keep_snapshots
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        con = sqlite3.connect(self.db_path, timeout=30)
+        con.executescript(SCHEMA)
+        return con
+
+    def record(self, df, version=None, now=None):
+        """Store one dataset version (no-op if already stored). Returns True if it was new."""
+        version = version or df.attrs.get("version")
+        now = now or time.time()
+        day = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        with self._lock:
+            con = self._connect()
+            try:
+                if con.execute("SELECT 1 FROM snapshots WHERE version = ?", (version,)).fetchone():
+                    return False
+                first = con.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 0
+                path = self._write_snapshot(df, day, version) if self.keep_snapshots else None
+                counts = circle_counts(df)
+                rows = [(day, milestone, circle, int(n), "snapshot")
+                        for circle, per_kpi in counts.iterrows() for milestone, n in per_kpi.items()]
+                with con:
+                    if first:
+                        # Seed the trend with what the dates already tell (snapshot rows win on overlap)
+                        seed = dated_burnup(df)
+                        seed = seed[seed["day"] < day]
+                        con.executemany("INSERT OR IGNORE INTO daily VALUES (?, ?, ?, ?, 'dates')",
+                                        seed[["day", "milestone", "circle", "reached"]].itertuples(index=False))
+                    con.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?)", rows)
+                    con.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?)", (version, day, now, len(df), path))
+                return True
+            finally:
+                con.close()
+
+    def _write_snapshot(self, df, day, version):
+        folder = os.path.join(self.root, f"day={day}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{str(version)[:16]}.parquet")
+        try:
+            df.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+        except Exception:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+            return None  # aggregates are still recorded
+        return path
+
+    def snapshots(self):
+        if not os.path.exists(self.db_path):
+            return pd.DataFrame(columns=["version", "day", "recorded_at", "rows", "path"])
+        with self._lock:
+            con = self._connect()
+            try:
+                return pd.read_sql_query("SELECT * FROM snapshots ORDER BY recorded_at", con)
+            finally:
+                con.close()
+
+    def burnup(self, milestones, circles=None):
+        """Hops that had reached each milestone, per day (rows) × milestone (columns), summed over circles.
+
+        Days between recorded days carry the last value forward. A milestone is
+        NA before its first recorded day (milestones without a date column have
+        no backfill, so their history starts at the first snapshot).
+        """
+        if not os.path.exists(self.db_path):
+            return pd.DataFrame(columns=milestones)
+        query = f"SELECT day, milestone, circle, reached FROM daily WHERE milestone IN ({','.join('?' * len(milestones))})"
+        params = list(milestones)
+        with self._lock:
+            con = self._connect()
+            try:
+                daily = pd.read_sql_query(query, con, params=params)
+            finally:
+                con.close()
+        if circles:
+            daily = daily[daily["circle"].isin([str(c) for c in circles])]
+        if daily.empty:
+            return pd.DataFrame(columns=milestones)
+        # Per circle, carry each milestone forward over days it was not recorded, then sum
+        wide = daily.pivot_table(index="day", columns=["milestone", "circle"], values="reached", aggfunc="last")
+        wide.index = pd.to_datetime(wide.index)
+        wide = wide.reindex(pd.date_range(wide.index.min(), wide.index.max(), freq="D")).ffill()
+        # A circle missing on a day its milestone was already tracked had reached none of it
+        first = pd.to_datetime(daily.groupby("milestone")["day"].min())
+        tracked = wide.index.to_numpy()[:, None] >= first.reindex(wide.columns.get_level_values("milestone")).to_numpy()
+        wide = wide.mask(wide.isna() & tracked, 0)
+        out = wide.T.groupby(level="milestone").sum(min_count=1).T
+        return out.reindex(columns=[m for m in milestones if m in out.columns]).astype("Int64")
+
+    def velocity(self, milestones, circles=None, freq="W"):
+        """Hops crossing each milestone per period (D or W), from the burn-up differences."""
+        burnup = self.burnup(milestones, circles)
+        if burnup.empty:
+            return burnup
+        per_day = burnup.diff().fillna(0).clip(lower=0)  # a milestone's first recorded day is no crossing
+        return per_day.resample(freq).sum().astype(int) if freq != "D" else per_day.astype(int)
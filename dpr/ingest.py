@@ -0,0 +1,15 @@
+# dpr/ingest.py — CSV bytes → dashboard frame
+import io
+
+import pandas as pd
+
+from dpr.lifecycle import add_lifecycle
+from dpr.schema import apply_schema, read_dtypes
+
+
+def parse_sheet(data):
+    """Parse the raw sheet CSV export into the typed frame the dashboard works on."""
+    df = pd.read_csv(io.BytesIO(data), dtype=read_dtypes(), low_memory=False)
+    apply_schema(df)
+    # Status is filter-independent → compute once per sync
+    return add_lifecycle(df)
@@ -0,0 +1,87 @@
+# dpr/kpis.py — Milestone KPI engine (one not-null matrix, one reduction)
+import numpy as np
+import pandas as pd
+
+from dpr.schema import NMS_FLAG
+
+# KPI label → (kind, column). "notna" counts filled milestone dates/ids,
+# "rfi" matches the (schema-stripped) RFI Status, "flag" reads a schema flag.
+# "Media" and "CRFAI" are derived below.
+KPI_DEFS = [
+    ("Scope", "scope", None),
+    ("LB", "notna", "PLAN ID"),
+    ("SR", "notna", "HOP SR Date"),
+    ("RFAI", "notna", "ACTUAL HOP RFAI OFFERED DATE"),
+    ("Survey", "notna", "Survey Date"),
+    ("PRI", "rfi", "PRI"),
+    ("CRFAI", "derived", None),
+    ("Media", "derived", None),
+    ("CCRFAI", "rfi", "CCRFAI"),
+    ("MO", "notna", "HOP MO DATE"),
+    ("Mat. Disp.", "notna", "HOP MATERIAL DISPATCH DATE"),
+    ("MOS", "notna", "HOP MATERIAL DELIVERY DATE"),
+    ("I&C", "notna", "HOP I&C DATE"),
+    ("Alignment", "notna", "Alignment Date"),
+    ("NMS Done", "flag", NMS_FLAG),
+    ("Phy AT Offer", "notna", "PHY-AT OFFER DATE"),
+    ("Soft AT Offer", "notna", "SOFT AT OFFER DATE"),
+    ("Phy AT Acc", "notna", "PHY-AT ACCEPTANCE DATE"),
+    ("Soft AT Acc", "notna", "SOFT AT ACCEPTANCE DATE"),
+    ("HOP AT Done", "notna", "HOP AT DATE"),
+]
+KPI_LABELS = [label for label, _, _ in KPI_DEFS]
+ALERT_KPIS = ["PRI", "CCRFAI"]
+
+
+def _notna(df, col):
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[col].notna().to_numpy()
+
+
+def kpi_matrix(df):
+    """Boolean hop × KPI matrix (CRFAI excluded — it is a difference of counts)."""
+    n = len(df)
+    cols = {}
+    for label, kind, col in KPI_DEFS:
+        if kind == "scope":
+            cols[label] = np.ones(n, dtype=bool)
+        elif kind == "notna":
+            cols[label] = _notna(df, col)
+        elif kind == "rfi":
+            cols[label] = ((df["RFI Status"] == col).to_numpy()
+                           if "RFI Status" in df.columns else np.zeros(n, dtype=bool))
+        elif kind == "flag":
+            cols[label] = df[col].to_numpy(dtype=bool)
+    cols["Media"] = cols["RFAI"] & _notna(df, "Media Date")
+    return pd.DataFrame(cols, index=df.index)
+
+
+def _with_crfai(counts):
+    counts["CRFAI"] = counts["RFAI"] - counts["PRI"]
+    return counts
+
+
+def compute_kpis(df, by=("Circle", "Month")):
+    """Milestone counts for the whole frame plus per-dimension breakdowns from one matrix.
+
+    Returns {"total": Series[label → count], <dim>: DataFrame[dim value × label]}.
+    """
+    matrix = kpi_matrix(df)
+    result = {"total": _with_crfai(matrix.sum()).reindex(KPI_LABELS).astype(int)}
+    for dim in by:
+        if dim in df.columns:
+            grouped = matrix.groupby(df[dim], sort=True, observed=True).sum()
+            result[dim] = _with_crfai(grouped)[KPI_LABELS].astype(int)
+    return result
+
+
+def kpi_list(counts):
+    """[(label, count), ...] in dashboard order."""
+    return [(label, int(counts[label])) for label in KPI_LABELS]
+
+
+def summary_frame(counts):
+    """Milestone / Count / % table used by the summary report."""
+    scope = int(counts["Scope"]) or 1
+    return pd.DataFrame([{"Milestone": l, "Count": v, "%": f"{v/scope*100:.2f}%"} for l, v in kpi_list(counts)])
@@ -0,0 +1,35 @@
+# dpr/lifecycle.py — Hop lifecycle (Current Status) engine
+import numpy as np
+import pandas as pd
+
+# Milestone date column → status label, highest precedence first.
+# Same order as the old row-wise get_status().
+STATUS_RULES = [
+    ("PRI OPEN DATE", "PRI Open"),
+    ("HOP AT DATE", "AT Completed"),
+    ("ACTUAL HOP RFAI OFFERED DATE", "RFAI Offered"),
+    ("HOP MATERIAL DELIVERY DATE", "Material Delivered"),
+    ("HOP MATERIAL DISPATCH DATE", "In-Transit"),
+]
+DEFAULT_STATUS = "Planning"
+
+# Stage code → label (0 = Planning ... 5 = PRI Open)
+STATUS_ORDER = [DEFAULT_STATUS] + [label for _, label in reversed(STATUS_RULES)]
+
+
+def lifecycle_stage(df):
+    """Furthest milestone reached per hop as an int8 stage code (index into STATUS_ORDER)."""
+    stage = np.zeros(len(df), dtype=np.int8)
+    # Walk lowest → highest precedence so the later (stronger) milestone wins
+    for code, (col, _) in enumerate(reversed(STATUS_RULES), start=1):
+        if col in df.columns:
+            stage[df[col].notna().to_numpy()] = code
+    return stage
+
+
+def add_lifecycle(df):
+    """Add "Current Status" (ordered categorical) and "Lifecycle Stage" columns in one columnar pass."""
+    stage = lifecycle_stage(df)
+    df["Current Status"] = pd.Categorical.from_codes(stage, categories=STATUS_ORDER, ordered=True)
+    df["Lifecycle Stage"] = stage
+    return df
@@ -0,0 +1,58 @@
+# dpr/lru.py — Thread-safe LRU map behind the per-dataset memo caches and the export cache
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRU:
+    """Least-recently-used map, bounded by entry count and/or total value size.
+
+    A value may be None (e.g. "no filter"). get_or_build runs the build outside
+    the lock, so two sessions missing the same key may both build it; the first
+    value stored is kept and returned to both. The newest entry is never
+    evicted, even when it alone exceeds max_size.
+    """
+
+    def __init__(self, max_entries=None, max_size=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0  # total sizeof(value), tracked only when max_size is set
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        """Store value under key unless already present; returns the stored value."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            self._items[key] = value
+            if self.max_size is not None:
+                self.size += self.sizeof(value)
+            while len(self._items) > 1 and self._over():
+                _, old = self._items.popitem(last=False)
+                if self.max_size is not None:
+                    self.size -= self.sizeof(old)
+            return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, build())
+        return value
+
+    def _over(self):
+        return ((self.max_entries is not None and len(self._items) > self.max_entries)
+                or (self.max_size is not None and self.size > self.max_size))
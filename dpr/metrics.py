@@ -0,0 +1,184 @@
+# dpr/metrics.py — Timing spans, cache counters and memory figures per rerun
+#
+#   rec = Recorder(enabled=True, log_path="metrics.jsonl")
+#   rec.start_run("full")
+#   with rec.span("load_data", cache=True):
+#       df = load_data()          # cached body calls metrics.miss() when it runs
+#   with rec.span("kpis"):
+#       ...
+#   rec.finish_run(rows=len(df))  # → rec.runs[-1], one JSON line in the log
+#
+# A disabled recorder hands out one shared null context, so instrumented code
+# costs an attribute check per span.
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+_active = threading.local()
+_log_lock = threading.Lock()
+_NULL = contextlib.nullcontext()
+
+HISTORY = 50
+
+
+def active():
+    """Recorder currently running in this thread (None outside a run)."""
+    return getattr(_active, "recorder", None)
+
+
+def miss():
+    """Mark the innermost open cache span of this thread's recorder as a miss.
+
+    Call it from inside a cached function body — the body only runs on a miss.
+    """
+    rec = active()
+    if rec is not None and rec._cache_stack:
+        rec._cache_stack[-1][1] = True
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource  # not on Windows; only reached where /proc is missing
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+
+_frame_mb = {}
+
+
+def frame_mb(df, key=None):
+    """Deep memory of a DataFrame in MB; memoized on `key` (e.g. dataset version or view hash)."""
+    if key is not None and key in _frame_mb:
+        return _frame_mb[key]
+    mb = df.memory_usage(deep=True).sum() / 2**20
+    if key is not None:
+        if len(_frame_mb) > 256:
+            _frame_mb.clear()
+        _frame_mb[key] = mb
+    return mb
+
+
+class _Span:
+    __slots__ = ("rec", "name", "cache", "t0", "entry")
+
+    def __init__(self, rec, name, cache):
+        self.rec, self.name, self.cache = rec, name, cache
+
+    def __enter__(self):
+        rec = self.rec
+        self.t0 = time.perf_counter()
+        if rec.run is None:
+            rec.start_run("fragment", implicit=True)
+        self.entry = {"name": self.name, "depth": rec._depth}
+        rec.run["spans"].append(self.entry)
+        rec._depth += 1
+        if self.cache:
+            rec._cache_stack.append([self.name, False])
+        return self
+
+    def __exit__(self, *exc):
+        rec = self.rec
+        self.entry["ms"] = round((time.perf_counter() - self.t0) * 1000, 2)
+        rec._depth -= 1
+        if self.cache:
+            name, missed = rec._cache_stack.pop()
+            self.entry["cache"] = "miss" if missed else "hit"
+            rec.cache[name, "miss" if missed else "hit"] += 1
+        if rec._depth == 0 and rec.run.get("implicit"):
+            rec.finish_run()
+        return False
+
+
+class Recorder:
+    """Per-session instrumentation: named spans per rerun, cache counters, memory.
+
+    Spans opened outside a run (a fragment rerunning on its own) start an
+    implicit "fragment" run that ends with the outermost span.
+    """
+
+    def __init__(self, enabled=False, log_path=None, session=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.session = session
+        self.run = None
+        self.runs = deque(maxlen=HISTORY)
+        self.cache = Counter()  # (name, "hit"|"miss") → count, over the session
+        self._depth = 0
+        self._cache_stack = []
+
+    def start_run(self, kind="full", implicit=False):
+        if not self.enabled:
+            return
+        if self.run is not None:
+            self.finish_run()
+        self.run = {"kind": kind, "started": time.time(), "t0": time.perf_counter(), "spans": []}
+        if implicit:
+            self.run["implicit"] = True
+        self._depth = 0
+        self._cache_stack = []
+        _active.recorder = self
+
+    def span(self, name, cache=False):
+        """Context manager timing one section; cache=True also counts hit/miss."""
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, cache)
+
+    def section(self, name):
+        """Decorator running the function inside a span; `name` may be a callable of its args."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def run(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.span(name(*args, **kwargs) if callable(name) else name):
+                    return fn(*args, **kwargs)
+            return run
+        return wrap
+
+    def finish_run(self, **extra):
+        """Close the current run: total time, RSS, extra figures; log one JSON line."""
+        run, self.run = self.run, None
+        if run is None:
+            return None
+        if getattr(_active, "recorder", None) is self:
+            _active.recorder = None
+        total_ms = round((time.perf_counter() - run.pop("t0")) * 1000, 2)
+        run.pop("implicit", None)
+        record = {"ts": round(run.pop("started"), 3), "session": self.session, "kind": run["kind"],
+                  "total_ms": total_ms, "rss_mb": round(rss_mb(), 1), **extra, "spans": run["spans"],
+                  "cache": {f"{name}:{kind}": n for (name, kind), n in sorted(self.cache.items())}}
+        self.runs.append(record)
+        self._write(record)
+        return record
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with _log_lock:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a") as f:
+                    f.write(line)
+        except OSError:
+            pass  # metrics must never break the dashboard
+
+    def cache_table(self):
+        """Rows of (name, hits, misses, hit rate) for the session so far."""
+        names = sorted({name for name, _ in self.cache})
+        rows = []
+        for name in names:
+            hits, misses = self.cache[name, "hit"], self.cache[name, "miss"]
+            rows.append({"Cache": name, "Hits": hits, "Misses": misses,
+                         "Hit %": round(100 * hits / (hits + misses), 1) if hits + misses else 0.0})
+        return rows
@@ -0,0 +1,108 @@
+# dpr/refresh.py — Stale-while-revalidate: background re-sync with an atomic dataset swap
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from dpr.cube import KpiCube
+from dpr.dataset import Dataset
+from dpr.history import HistoryStore
+from dpr.sources import MultiSync
+
+INTERVAL = 60       # seconds between syncs
+MAX_BACKOFF = 900   # cap on the retry delay while syncs keep failing
+
+# What a page render reads: one dataset and the cube built for it, swapped together
+Live = namedtuple("Live", ["dataset", "cube"])
+
+
+class Refresher:
+    """Keeps the served dataset fresh without any request waiting on the sheets.
+
+    A daemon thread syncs every `interval` seconds (backing off while syncs
+    fail). A new version is parsed, indexed and cubed off the request path,
+    then published as one `Live` pair, so a render sees either the old or the
+    new data whole. Failures only update `status`: the last good dataset keeps
+    being served. The cube is also rebuilt when the day rolls over. Each new
+    version is appended to the history store, whether or not anyone is viewing.
+    """
+
+    def __init__(self, sources=None, history=None, interval=INTERVAL, max_backoff=MAX_BACKOFF):
+        self.sources = sources if sources is not None else MultiSync()
+        self.history = history if history is not None else HistoryStore(self.sources.cache_dir)
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.live = None
+        self.status = {"ok": None, "error": None, "failures": 0, "checked_at": None, "seconds": None}
+        self._ready = threading.Event()  # set once there is data, or a sync has failed without any
+        self._thread = threading.Thread(target=self._run, name="dpr-refresh", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, frame):
+        """Build the dataset and cube for frame (reusing the live ones if current) and swap them in."""
+        live = self.live
+        today = pd.Timestamp.now().date()
+        if live is not None and live.dataset.version == frame.attrs.get("version"):
+            if live.cube.now.date() == today:
+                return live
+            dataset = live.dataset
+        else:
+            dataset = Dataset(frame)
+            # New version → append it to the trend history off the swap path
+            threading.Thread(target=self.history.record, args=(dataset.frame, dataset.version), daemon=True).start()
+        self.live = Live(dataset, KpiCube(dataset.frame, now=pd.Timestamp.now()))
+        self._ready.set()
+        return self.live
+
+    def refresh(self):
+        """One sync of every source; publishes a changed frame. Returns True if the sync succeeded."""
+        t0 = time.perf_counter()
+        try:
+            self.sources.load(max_age=0)
+            error = "; ".join(f"{name}: {s['error']}" for name, s in self.sources.status.items() if not s["ok"]) or None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        try:
+            frame = self.sources.current()
+            if frame is not None:
+                self.publish(frame)
+        except Exception as e:  # the new data could not be built: keep serving the last dataset
+            error = f"{type(e).__name__}: {e}"
+        self.status = {"ok": error is None, "error": error,
+                       "failures": 0 if error is None else self.status["failures"] + 1,
+                       "checked_at": time.time(), "seconds": round(time.perf_counter() - t0, 2)}
+        self._ready.set()
+        try:
+            if self.live is not None:
+                self.live.dataset.search  # build the search index now rather than on the first query
+        except Exception as e:  # a query builds it again; the dataset itself is fine
+            self.status = {**self.status, "error": f"search index: {type(e).__name__}: {e}"}
+        return error is None
+
+    def delay(self):
+        return min(self.interval * 2 ** self.status["failures"], self.max_backoff)
+
+    def _run(self):
+        while True:
+            time.sleep(self.delay())
+            try:
+                self.refresh()
+            except Exception as e:  # never let the schedule die; the last dataset stays live
+                self.status = {**self.status, "ok": False, "error": f"{type(e).__name__}: {e}",
+                               "failures": self.status["failures"] + 1, "checked_at": time.time()}
+
+    # ── serving ──
+    def get(self, timeout=None):
+        """The live (dataset, cube); waits only until the first data or first sync (None if there is no data)."""
+        self._ready.wait(timeout)
+        return self.live
+
+    def data_age(self):
+        """Seconds since the served data was last confirmed against the sheets (None if never)."""
+        checked = [s.meta.get("checked_at") for s in self.sources.syncs.values() if s.frame is not None]
+        checked = [c for c in checked if c]
+        return time.time() - min(checked) if checked else None
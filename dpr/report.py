@@ -0,0 +1,140 @@
+# dpr/report.py — Headless batch reports: summary + pending workbooks per circle (and month)
+#
+#   python -m dpr.report --out reports/                       # every circle + All, XLSX
+#   python -m dpr.report --by Circle,Month --format CSV
+#   python -m dpr.report --input sheet.csv --out /tmp/dpr      # from a local export
+#
+# The data is loaded once in the parent; workers in a process pool each build
+# the workbooks of one group from that frame's row positions.
+import argparse
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from dpr.aging import BUCKET_LABELS, compute_aging
+from dpr.exports import EXPORT_FORMATS, write_workbook
+from dpr.filters import FilterIndex, make_selection
+from dpr.kpis import compute_kpis, summary_frame
+from dpr.stages import AGING_STAGES, ALL_STAGES, PENDING_STAGES, evaluate_stages, pending_list
+
+ALL = "All"
+_frame = None  # set in each worker by _init
+
+
+def load_frame(path=None):
+    """A local CSV / Parquet export, or the configured sources (synced, snapshot on failure)."""
+    if path is None:
+        from dpr.sources import MultiSync
+
+        return MultiSync().load()
+    if path.endswith(".parquet"):
+        from dpr.schema import text_dtypes
+
+        return text_dtypes(pd.read_parquet(path))
+    from dpr.ingest import parse_sheet
+
+    with open(path, "rb") as f:
+        return parse_sheet(f.read())
+
+
+def report_groups(df, by):
+    """[(labels, row positions or None)] — the whole frame first, then each combination of the `by` values."""
+    index = FilterIndex(df, dims=by)
+    groups = [((ALL,), None)]
+    combos = [()]
+    for dim in by:
+        values = list(index.postings.get(dim, {}))
+        combos = [c + ((dim, v),) for c in combos for v in values]
+    for combo in combos:
+        rows = index.rows(make_selection({dim: [v] for dim, v in combo}))
+        if rows is not None and len(rows):
+            groups.append((tuple(v for _, v in combo), rows))
+    return groups
+
+
+def summary_sheets(df, now):
+    """Milestone Summary Report and Aging Summary tables for one group."""
+    kpis = compute_kpis(df)
+    membership = evaluate_stages(df, ALL_STAGES)
+    aging = compute_aging(df, membership, ALL_STAGES, now=now)
+    aging_names = [s["name"] for s in AGING_STAGES]
+    sheets = {"Milestones": summary_frame(kpis["total"])}
+    for dim in ("Circle", "Month"):
+        if dim in kpis and len(kpis[dim]) > 1:
+            sheets[f"Milestones by {dim}"] = kpis[dim].reset_index()
+    sheets["Aging Summary"] = aging["summary"].loc[aging_names].round({"Avg Aging": 1}).reset_index()
+    sheets["Aging Buckets"] = aging["buckets"].loc[aging_names, BUCKET_LABELS].rename_axis("Stage").reset_index()
+    sheets["Pending by Stage"] = aging["summary"].loc[[s["name"] for s in PENDING_STAGES]].round({"Avg Aging": 1}).reset_index()
+    return sheets, membership, aging["days"]
+
+
+def pending_sheets(df, membership, days):
+    """One pending list per stage, oldest first — the dashboard's pending tabs."""
+    return {stage["name"]: pending_list(df, membership, stage, days).sort_values("Days Pending", ascending=False)
+            for stage in ALL_STAGES}
+
+
+def _safe(label):
+    return re.sub(r"[^\w.-]+", "_", str(label)).strip("_") or "blank"
+
+
+def _init(frame):
+    global _frame
+    _frame = frame
+
+
+def build_group(labels, rows, out_dir, fmt, now, stamp):
+    """Write the summary and pending workbooks of one group; returns (labels, paths, hops)."""
+    df = _frame if rows is None else _frame.iloc[rows]
+    stem = os.path.join(out_dir, "_".join(["APTG_MW"] + [_safe(l) for l in labels] + [stamp]))
+    sheets, membership, days = summary_sheets(df, now)
+    paths = write_workbook(sheets, fmt, f"{stem}_Summary")
+    paths += write_workbook(pending_sheets(df, membership, days), fmt, f"{stem}_Pending")
+    return labels, paths, len(df)
+
+
+def run(df, out_dir, by=("Circle",), fmt="XLSX", workers=None, now=None):
+    """Build every group's workbooks in a process pool. Returns [(labels, paths, hops)]."""
+    os.makedirs(out_dir, exist_ok=True)
+    now = now if now is not None else pd.Timestamp.now()
+    stamp = now.strftime("%d%b%Y")
+    groups = report_groups(df, list(by))
+    # fork shares the loaded frame with workers without pickling it; spawn sends it once per worker
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init, initargs=(df,)) as pool:
+        futures = [pool.submit(build_group, labels, rows, out_dir, fmt, now, stamp) for labels, rows in groups]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda r: (r[0] != (ALL,), r[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write DPR summary and pending workbooks per circle / month.")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--by", default="Circle", help="comma list of dimensions, e.g. Circle or Circle,Month")
+    parser.add_argument("--format", default="XLSX", choices=[f for f in EXPORT_FORMATS if f != "Parquet"])
+    parser.add_argument("--input", help="local CSV / Parquet export instead of syncing the configured sheets")
+    parser.add_argument("--workers", type=int, help="process count (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    df = load_frame(args.input)
+    t_load = time.perf_counter() - t0
+    results = run(df, args.out, by=[d.strip() for d in args.by.split(",")], fmt=args.format, workers=args.workers)
+    for labels, paths, hops in results:
+        print(f"{' / '.join(labels):<30} {hops:>9,} hops  {len(paths)} file(s)")
+    print(f"{len(results)} groups, {sum(len(p) for _, p, _ in results)} files in {args.out} — "
+          f"load {t_load:.1f}s, reports {time.perf_counter() - t0 - t_load:.1f}s "
+          f"({datetime.now().strftime('%d %b %y %H:%M')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# dpr/schema.py — Typed ingest schema for the DPR sheet
+import numpy as np
+import pandas as pd
+
+# Milestone date columns. Any other column whose name contains "Date"/"DATE"
+# is parsed the same way so new sheet columns keep working.
+DATE_COLUMNS = [
+    "HOP SR Date",
+    "ACTUAL HOP RFAI OFFERED DATE",
+    "Media Date",
+    "Survey Date",
+    "HOP MO DATE",
+    "HOP MATERIAL DISPATCH DATE",
+    "HOP MATERIAL DELIVERY DATE",
+    "HOP I&C DATE",
+    "Alignment Date",
+    "INTEGRATION DATE",
+    "PHY-AT OFFER DATE",
+    "SOFT AT OFFER DATE",
+    "PHY-AT ACCEPTANCE DATE",
+    "SOFT AT ACCEPTANCE DATE",
+    "HOP AT DATE",
+    "PRI OPEN DATE",
+]
+# Tried in order; values matching none fall back to day-first inference.
+DATE_FORMATS = ["%d-%b-%y", "%d-%b-%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"]
+
+# Low-cardinality text → stripped categorical (sidebar filters, RFI checks)
+CATEGORY_COLUMNS = [
+    "Circle",
+    "Month",
+    "Priority(P0/P1)",
+    "RFI Status",
+    "Final Remarks",
+    "Nominal Aop",
+    "VISIBLE IN NMS",
+]
+# Free text / ids — kept as strings (no int coercion of site ids)
+TEXT_COLUMNS = ["HOP A-B", "SITE ID A", "SITE ID B", "PLAN ID", "CIRCLE_REMARK_1"]
+# Arrow-backed: one contiguous buffer per column instead of a Python object per cell
+TEXT_DTYPE = "string[pyarrow]"
+
+# Derived flags computed once at load
+NMS_FLAG = "NMS Visible"
+
+
+def read_dtypes():
+    """dtype mapping for pd.read_csv (missing columns are ignored by pandas)."""
+    dtypes = {col: str for col in DATE_COLUMNS}
+    dtypes.update({col: TEXT_DTYPE for col in TEXT_COLUMNS})
+    dtypes.update({col: "category" for col in CATEGORY_COLUMNS})
+    return dtypes
+
+
+def text_dtypes(df):
+    """Restore TEXT_DTYPE on text columns (Parquet snapshots read back as Python strings)."""
+    for col in TEXT_COLUMNS:
+        if col in df.columns and df[col].dtype != TEXT_DTYPE:
+            df[col] = df[col].astype(TEXT_DTYPE)
+    return df
+
+
+def date_columns(df):
+    extra = df.columns[df.columns.str.contains("Date|DATE", case=False)]
+    return [c for c in DATE_COLUMNS if c in df.columns] + [c for c in extra if c not in DATE_COLUMNS]
+
+
+def parse_dates(s):
+    """Parse a text column with the fixed formats, working on unique values only."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    codes, uniques = pd.factorize(s)
+    values = pd.Series(uniques, dtype="string").str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        todo = parsed.isna() & values.notna()
+        if not todo.any():
+            break
+        parsed[todo] = pd.to_datetime(values[todo], format=fmt, errors="coerce")
+    todo = parsed.isna() & values.notna() & (values != "")
+    if todo.any():
+        parsed[todo] = pd.to_datetime(values[todo], format="mixed", dayfirst=True, errors="coerce")
+    # code -1 (blank cell) → trailing NaT; also covers a column with no values at all
+    out = np.append(parsed.to_numpy(), np.datetime64("NaT", "ns"))[codes]
+    return pd.Series(out, index=s.index, name=s.name)
+
+
+def normalize_category(s):
+    """Categorical with stripped labels; blanks become NaN."""
+    s = s.astype("category")
+    labels = s.cat.categories.astype(str).str.strip()
+    if labels.equals(s.cat.categories) and "" not in labels:
+        return s
+    new_cats = pd.Index(labels[labels != ""].unique()).sort_values()
+    mapping = new_cats.get_indexer(labels)  # "" → -1
+    codes = s.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, mapping[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, new_cats), index=s.index, name=s.name)
+
+
+def apply_schema(df):
+    """Type the raw frame in place: dates, stripped categoricals, derived flags."""
+    for col in date_columns(df):
+        df[col] = parse_dates(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = normalize_category(df[col])
+    df[NMS_FLAG] = category_flag(df, "VISIBLE IN NMS", lambda labels: labels.str.contains("YES|Yes|yes"))
+    return df
+
+
+def category_flag(df, col, test):
+    """Boolean column from a test on the categories of a categorical column (NaN → False)."""
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    s = df[col]
+    hits = np.append(np.asarray(test(s.cat.categories.astype(str)), dtype=bool), False)
+    return hits[s.cat.codes.to_numpy()]  # code -1 (NaN) → trailing False
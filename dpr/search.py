@@ -0,0 +1,148 @@
+# dpr/search.py — Instant hop search: prefix + trigram index over hop ids, site ids and remarks
+import bisect
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dpr.lru import LRU
+
+SEARCH_COLS = ["HOP A-B", "SITE ID A", "SITE ID B", "PLAN ID", "CIRCLE_REMARK_1", "Final Remarks"]
+NGRAM = 3
+
+
+def normalize(arr):
+    """Trimmed, upper-cased Arrow strings; blanks become null."""
+    arr = pc.utf8_upper(pc.utf8_trim_whitespace(arr))
+    return pc.if_else(pc.equal(arr, ""), pa.scalar(None, pa.string()), arr)
+
+
+def _strings(s):
+    arr = pa.array(s, from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_decode()
+    return arr.cast(pa.string())
+
+
+def _gather(starts, ids, values):
+    """Concatenate values[starts[i]:starts[i + 1]] for each i in ids (CSR rows) without a Python loop."""
+    if len(ids) and ids[-1] - ids[0] + 1 == len(ids):  # a run of ids (prefix match): one slice
+        return values[starts[ids[0]]:starts[ids[-1] + 1]]
+    lo, hi = starts[ids], starts[ids + 1]
+    lengths = hi - lo
+    total = int(lengths.sum())
+    if total == 0:
+        return values[:0]
+    offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(total)]
+
+
+class _Terms:
+    """Sorted vocabulary as a read-only sequence of bytes (for bisect), backed by the Arrow buffers."""
+
+    def __init__(self, offsets, data):
+        self.offsets, self.data = offsets, data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+
+class SearchIndex:
+    """Distinct-value search over the hop id and remark columns.
+
+    Every distinct cell value (upper-cased, over all SEARCH_COLS) is a term;
+    terms are kept sorted as one UTF-8 buffer, with each term's row positions
+    in a CSR array. Queries shorter than NGRAM bytes match term prefixes by
+    binary search; longer ones intersect the term lists of their trigrams and
+    check the few candidates for the full substring. Built once per dataset
+    version; results are memoized per query with LRU eviction.
+    """
+
+    def __init__(self, df, cols=SEARCH_COLS, cache_size=64):
+        cols = [c for c in cols if c in df.columns]
+        normed = [normalize(_strings(df[c])) for c in cols]
+        vocab = pc.unique(pa.concat_arrays(normed) if normed else pa.array([], pa.string())).drop_null()
+        vocab = vocab.take(pc.sort_indices(vocab))
+        self.n = len(df)
+        self.n_terms = len(vocab)
+        self.offsets = np.frombuffer(vocab.buffers()[1], dtype=np.int32)[:self.n_terms + 1].astype(np.int64)
+        self.data = (np.frombuffer(vocab.buffers()[2], dtype=np.uint8)[:self.offsets[-1]].copy()
+                     if self.n_terms else np.empty(0, dtype=np.uint8))
+        self.terms = _Terms(self.offsets, self.data)
+
+        # term → rows (a row is listed once per column it matches in)
+        term_ids, rows = [], []
+        for arr in normed:
+            ids = pc.index_in(arr, value_set=vocab).fill_null(-1).to_numpy(zero_copy_only=False)
+            hit = np.flatnonzero(ids >= 0)
+            term_ids.append(ids[hit])
+            rows.append(hit.astype(np.int32))
+        term_ids = np.concatenate(term_ids) if term_ids else np.empty(0, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        self.term_rows = (np.concatenate(rows) if rows else np.empty(0, dtype=np.int32))[order]
+        self.term_starts = np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=self.n_terms))])
+
+        self._build_ngrams()
+        self._cache = LRU(cache_size)
+
+    def _build_ngrams(self):
+        """Trigram → sorted term ids, from every NGRAM-byte window of every term."""
+        windows = np.clip(np.diff(self.offsets) - NGRAM + 1, 0, None)
+        if windows.sum() == 0:  # no terms, or none NGRAM bytes long (empty / blank sheet)
+            self.gram_keys = np.empty(0, dtype=np.int64)
+            self.gram_starts = np.zeros(1, dtype=np.int64)
+            self.gram_terms = np.empty(0, dtype=np.int32)
+            return
+        term = np.repeat(np.arange(self.n_terms, dtype=np.int64), windows)
+        # byte position of each window: term start + window number within the term
+        pos = self.offsets[term] + np.arange(len(term)) - np.repeat(np.cumsum(windows) - windows, windows)
+        code = np.zeros(len(pos), dtype=np.int64)
+        for k in range(NGRAM):
+            code = (code << 8) | self.data[pos + k]
+        keys = np.sort((code << 32) | term)  # by gram, then term
+        keys = keys[np.append(True, np.diff(keys) != 0)]  # a gram repeated within one term counts once
+        grams = keys >> 32
+        first = np.flatnonzero(np.append(True, np.diff(grams) != 0))
+        self.gram_keys = grams[first]
+        self.gram_starts = np.append(first, len(keys))
+        self.gram_terms = (keys & 0xFFFFFFFF).astype(np.int32)
+
+    # ── lookup ──
+    def match_terms(self, q):
+        """Sorted ids of the terms containing q (a normalized UTF-8 query), or starting with it if short."""
+        if len(q) < NGRAM:
+            lo = bisect.bisect_left(self.terms, q)
+            hi = bisect.bisect_left(self.terms, q + b"\xff", lo)
+            return np.arange(lo, hi)
+        codes = np.unique([int.from_bytes(q[i:i + NGRAM], "big") for i in range(len(q) - NGRAM + 1)])
+        idx = np.searchsorted(self.gram_keys, codes)
+        if (idx >= len(self.gram_keys)).any() or (self.gram_keys[idx] != codes).any():
+            return np.empty(0, dtype=np.int64)  # some trigram occurs in no term
+        lists = sorted((self.gram_terms[self.gram_starts[i]:self.gram_starts[i + 1]] for i in idx), key=len)
+        cand = lists[0]
+        for other in lists[1:]:
+            # membership by binary search: cost follows the (short) candidate list, not `other`
+            cand = cand[other[np.minimum(np.searchsorted(other, cand), len(other) - 1)] == cand]
+        if len(q) == NGRAM:
+            return cand
+        return np.array([t for t in cand.tolist() if q in self.terms[t]], dtype=np.int64)
+
+    def rows(self, query):
+        """Sorted row positions whose value in any SEARCH_COLS contains the query (None for a blank query)."""
+        q = str(query).strip().upper().encode()
+        if not q:
+            return None
+        return self._cache.get_or_build(q, lambda: self._rows(q))
+
+    def _rows(self, q):
+        rows = _gather(self.term_starts, self.match_terms(q), self.term_rows)
+        if len(rows) > self.n // 64:  # broad match: a row mask beats sorting
+            hit = np.zeros(self.n, dtype=bool)
+            hit[rows] = True
+            return np.flatnonzero(hit).astype(np.int32)
+        return np.unique(rows)
@@ -0,0 +1,155 @@
+# dpr/sources.py — Several sheets / tabs synced concurrently into one frame
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dpr.sync import CACHE_DIR, SheetSync, sheet_csv_url
+
+SOURCE_COL = "Source"
+DEADLINE = 45  # seconds a load waits for slow sources before serving their last good frame
+
+# One dict per tracker: name (snapshot file + Source label), either sheet_id/gid
+# or a full CSV url, and an optional circle tag filled into blank Circle cells.
+# DPR_SOURCES overrides this with a JSON list, inline or as a file path.
+DEFAULT_SOURCES = [{"name": "sheet"}]
+
+
+def load_sources(spec=None):
+    """Source list from a JSON string / file path (default: DPR_SOURCES, else DEFAULT_SOURCES)."""
+    spec = spec if spec is not None else os.environ.get("DPR_SOURCES")
+    if not spec:
+        return [dict(s) for s in DEFAULT_SOURCES]
+    if not spec.lstrip().startswith("["):
+        with open(spec) as f:
+            spec = f.read()
+    sources = json.loads(spec)
+    names = [s["name"] for s in sources]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate source names in {names}")
+    return sources
+
+
+def source_url(source):
+    if source.get("url"):
+        return source["url"]
+    if source.get("sheet_id"):
+        return sheet_csv_url(source["sheet_id"], str(source.get("gid", "0")))
+    return None  # SheetSync falls back to DPR_SHEET_URL / the default sheet
+
+
+def tag_circle(frame, circle):
+    """Fill blank (or missing) Circle cells with the source's circle tag."""
+    if "Circle" in frame.columns:
+        col = frame["Circle"]
+    else:
+        col = pd.Series(pd.Categorical.from_codes(np.full(len(frame), -1), categories=[circle]), index=frame.index)
+    if circle not in col.cat.categories:
+        col = col.cat.add_categories([circle])
+    return frame.assign(Circle=col.fillna(circle))
+
+
+def merge_frames(parts):
+    """Concatenate (source, frame) parts with one schema.
+
+    Columns missing from a part become null (False for flags); categoricals
+    are unioned on their codes so the merged columns stay categorical.
+    """
+    frames = []
+    for source, frame in parts:
+        if source.get("circle"):
+            frame = tag_circle(frame, source["circle"])
+        frames.append(frame.assign(**{SOURCE_COL: source["name"]}))
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+
+    for col in merged.columns:
+        dtypes = [f[col].dtype for f in frames if col in f.columns]
+        if isinstance(dtypes[0], pd.CategoricalDtype):
+            template = dtypes[0].categories
+            pieces = [f[col].array if col in f.columns
+                      else pd.Categorical.from_codes(np.full(len(f), -1), categories=template,
+                                                     ordered=dtypes[0].ordered)
+                      for f in frames]
+            union = union_categoricals(pieces, sort_categories=not dtypes[0].ordered)
+            merged[col] = pd.Series(union, index=merged.index)
+        elif dtypes[0] == bool and merged[col].dtype != bool:
+            merged[col] = merged[col].fillna(False).astype(bool)
+    merged[SOURCE_COL] = merged[SOURCE_COL].astype("category")
+    return merged
+
+
+class MultiSync:
+    """Keeps several sources in sync concurrently and serves their merged frame.
+
+    Each source is its own SheetSync (own snapshot, ETag and hash checks), run
+    on a thread pool: fetch and parse overlap, so a load takes about as long as
+    the slowest source. A source that fails or misses the deadline keeps
+    serving its last good frame; one with no frame at all is left out.
+    `status` reports every source's outcome of the last load.
+    """
+
+    def __init__(self, sources=None, cache_dir=CACHE_DIR, deadline=DEADLINE):
+        self.sources = sources or load_sources()
+        self.cache_dir = cache_dir
+        self.syncs = {s["name"]: SheetSync(url=source_url(s), cache_dir=cache_dir, name=s["name"])
+                      for s in self.sources}
+        self.deadline = deadline
+        self.status = {}
+        self.frame = None
+        self._versions = None
+        self._pool = ThreadPoolExecutor(max_workers=min(8, len(self.sources)), thread_name_prefix="dpr-sync")
+
+    def _load_one(self, name, max_age):
+        t0 = time.perf_counter()
+        sync = self.syncs[name]
+        try:
+            sync.load(max_age=max_age)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {"ok": error is None, "error": error, "seconds": round(time.perf_counter() - t0, 2)}
+
+    def load(self, max_age=0):
+        """Sync all sources concurrently and return the merged frame (raises only if no source has data)."""
+        futures = {name: self._pool.submit(self._load_one, name, max_age) for name in self.syncs}
+        wait(futures.values(), timeout=self.deadline)
+        status = {}
+        for name, future in futures.items():
+            if future.done():
+                status[name] = future.result()
+            else:
+                status[name] = {"ok": False, "error": f"still syncing after {self.deadline}s", "seconds": None}
+            sync = self.syncs[name]
+            status[name].update(rows=len(sync.frame) if sync.frame is not None else 0,
+                                stale=not status[name]["ok"] and sync.frame is not None,
+                                synced_at=sync.meta.get("synced_at"))
+        self.status = status
+
+        frame = self.current()
+        if frame is None:
+            raise RuntimeError("no source could be loaded: " +
+                               "; ".join(f"{n}: {s['error']}" for n, s in status.items()))
+        return frame
+
+    def current(self):
+        """Merged frame of what the sources hold in memory right now, without syncing (None if nothing)."""
+        parts = [(s, self.syncs[s["name"]].frame) for s in self.sources if self.syncs[s["name"]].frame is not None]
+        if not parts:
+            return None
+        versions = tuple((s["name"], f.attrs.get("version")) for s, f in parts)
+        if self.frame is None or versions != self._versions:
+            self.frame = self._merge(parts, versions)
+            self._versions = versions
+        return self.frame
+
+    def _merge(self, parts, versions):
+        if len(self.sources) == 1 and not self.sources[0].get("circle"):
+            return parts[0][1]  # single plain source: its frame and version as-is
+        frame = merge_frames(parts)
+        frame.attrs["version"] = hashlib.sha256(repr(versions).encode()).hexdigest()
+        return frame
@@ -0,0 +1,103 @@
+# dpr/stages.py — Declarative pending-stage rules engine
+import numpy as np
+
+RFAI = "ACTUAL HOP RFAI OFFERED DATE"
+
+# A hop has *reached* a stage when every `requires` date is filled, is *done*
+# when `completes` is filled too, and is *pending* when reached, not done and
+# not matched by `exclude` ({column: [values]}, compared case-insensitively).
+# `aging_base` is the date pending days are counted from.
+PENDING_STAGES = [
+    {"name": "Survey", "requires": [RFAI, "Media Date"], "completes": "Survey Date", "aging_base": RFAI},
+    {"name": "MO", "requires": ["Survey Date"], "completes": "HOP MO DATE", "aging_base": "Survey Date",
+     "exclude": {"RFI Status": ["pending"]}},
+    {"name": "I&C", "requires": ["HOP MATERIAL DELIVERY DATE"], "completes": "HOP I&C DATE",
+     "aging_base": "HOP MATERIAL DELIVERY DATE"},
+    {"name": "MS1", "requires": ["HOP I&C DATE"], "completes": "Alignment Date", "aging_base": "HOP I&C DATE"},
+    {"name": "Phy AT", "requires": ["HOP I&C DATE"], "completes": "PHY-AT ACCEPTANCE DATE", "aging_base": "HOP I&C DATE"},
+    {"name": "Soft AT", "requires": ["Alignment Date"], "completes": "SOFT AT ACCEPTANCE DATE", "aging_base": "Alignment Date"},
+]
+
+# Milestone-to-milestone aging tabs
+AGING_STAGES = [
+    {"name": "RFAI → MS1", "requires": [RFAI], "completes": "INTEGRATION DATE", "aging_base": RFAI},
+    {"name": "MS1 → MS2", "requires": ["INTEGRATION DATE"], "completes": "HOP AT DATE", "aging_base": "INTEGRATION DATE"},
+    {"name": "RFAI → MS2", "requires": [RFAI], "completes": "HOP AT DATE", "aging_base": RFAI},
+]
+
+ALL_STAGES = AGING_STAGES + PENDING_STAGES
+
+
+class StageMembership:
+    """Hop × stage boolean matrices (reached / done / pending) for a set of stage rules."""
+
+    def __init__(self, names, reached, done, pending):
+        self.names = names
+        self.reached = reached
+        self.done = done
+        self.pending = pending
+        self._col = {name: i for i, name in enumerate(names)}
+
+    def counts(self, which="pending"):
+        return dict(zip(self.names, getattr(self, which).sum(axis=0).tolist()))
+
+    def rows(self, name, which="pending"):
+        """Row positions (into the evaluated frame) of hops in the given state for a stage."""
+        return np.flatnonzero(getattr(self, which)[:, self._col[name]])
+
+
+def stage_columns(stages):
+    """Columns evaluate_stages() and aging_days() read for these stages (rules + aging bases)."""
+    cols = []
+    for stage in stages:
+        for col in [*stage["requires"], stage["completes"], *stage.get("exclude", {}), stage["aging_base"]]:
+            if col not in cols:
+                cols.append(col)
+    return cols
+
+
+def evaluate_stages(df, stages):
+    """Evaluate every stage rule in one pass over a shared not-null cache."""
+    n = len(df)
+    notna = {}
+
+    def filled(col):
+        if col not in notna:
+            notna[col] = df[col].notna().to_numpy() if col in df.columns else np.zeros(n, dtype=bool)
+        return notna[col]
+
+    k = len(stages)
+    reached = np.zeros((n, k), dtype=bool)
+    done = np.zeros((n, k), dtype=bool)
+    pending = np.zeros((n, k), dtype=bool)
+    for i, stage in enumerate(stages):
+        r = np.ones(n, dtype=bool)
+        for col in stage["requires"]:
+            r &= filled(col)
+        d = r & filled(stage["completes"])
+        p = r & ~d
+        for col, values in stage.get("exclude", {}).items():
+            if col in df.columns:
+                p &= ~df[col].str.lower().isin([v.lower() for v in values]).to_numpy()
+        reached[:, i], done[:, i], pending[:, i] = r, d, p
+    return StageMembership([s["name"] for s in stages], reached, done, pending)
+
+
+def stage_frame(df, rows, cols):
+    """Only the requested cells of the requested rows — one take, no full-frame copy."""
+    cols = [c for c in cols if c in df.columns]
+    return df.iloc[rows, df.columns.get_indexer(cols)]
+
+
+PENDING_COLS = ["Circle", "HOP A-B", "SITE ID A", "SITE ID B", "CIRCLE_REMARK_1"]
+
+
+def pending_list(df, membership, stage, days):
+    """Pending hops of one stage: hop ids, remark, aging base date and Days Pending.
+
+    `days` is the {aging base column: days-since} mapping from aging.aging_days for the same rows.
+    """
+    rows = membership.rows(stage["name"])
+    table = stage_frame(df, rows, PENDING_COLS + [stage["aging_base"]]).copy()
+    table["Days Pending"] = days[stage["aging_base"]][rows]
+    return table
@@ -0,0 +1,137 @@
+# dpr/sync.py — Change-aware Google Sheet sync with a local Parquet snapshot
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+from dpr.ingest import parse_sheet
+from dpr.schema import text_dtypes
+
+SHEET_ID = "1BD-Bww-k_3jVwJAGqBbs02YcOoUyNrOWcY_T9xvnbgY"
+GID = "0"
+CACHE_DIR = os.environ.get("DPR_CACHE_DIR", ".dpr_cache")
+
+
+def sheet_csv_url(sheet_id=SHEET_ID, gid=GID):
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+
+def fetch(url, etag=None, last_modified=None, timeout=30):
+    """GET url with HTTP validators. Returns (body or None if 304, response headers)."""
+    req = urllib.request.Request(url)
+    if etag:
+        req.add_header("If-None-Match", etag)
+    if last_modified:
+        req.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read(), resp.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, e.headers
+        raise
+
+
+class SheetSync:
+    """Keeps one sheet in sync with a local snapshot.
+
+    A sync only re-parses when the downloaded bytes changed (ETag/Last-Modified
+    304s and a SHA-256 of the body both short-circuit). The last good frame is
+    kept as <name>.parquet + <name>.json under cache_dir so a restart reads
+    from disk instead of the network.
+    """
+
+    def __init__(self, url=None, cache_dir=CACHE_DIR, name="sheet", parse=parse_sheet):
+        self.url = url or os.environ.get("DPR_SHEET_URL") or sheet_csv_url()
+        self.cache_dir = cache_dir
+        self.name = name
+        self.parse = parse
+        self.frame = None
+        self.meta = {}
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.cache_dir, f"{self.name}.parquet")
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.cache_dir, f"{self.name}.json")
+
+    # ── snapshot ──
+    def load_snapshot(self):
+        """Load the on-disk snapshot into memory. Returns True if one was found."""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            frame = text_dtypes(pd.read_parquet(self.snapshot_path))
+        except (OSError, ValueError):
+            return False
+        frame.attrs["version"] = meta.get("sha256")
+        self.frame, self.meta = frame, meta
+        return True
+
+    def _write_meta(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def _write_snapshot(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            self.frame.to_parquet(tmp, index=False)
+        except Exception:
+            # Snapshot is best-effort — a column Arrow can't type must not break the sync.
+            # Drop any older snapshot too so it can't be mistaken for this version.
+            for path in (tmp, self.snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+        os.replace(tmp, self.snapshot_path)
+        return True
+
+    # ── sync ──
+    def load(self, max_age=0):
+        """Return the current frame, syncing with the sheet if the last check is older than max_age seconds."""
+        with self._lock:
+            if self.frame is None:
+                self.load_snapshot()
+            if self.frame is not None and time.time() - self.meta.get("checked_at", 0) < max_age:
+                return self.frame
+            self.sync()
+            return self.frame
+
+    def sync(self):
+        """Fetch the sheet; parse and snapshot only if it changed. Returns True if the data changed."""
+        have_frame = self.frame is not None
+        body, headers = fetch(
+            self.url,
+            etag=self.meta.get("etag") if have_frame else None,
+            last_modified=self.meta.get("last_modified") if have_frame else None,
+        )
+        now = time.time()
+        changed = False
+        if body is not None:
+            digest = hashlib.sha256(body).hexdigest()
+            if not have_frame or digest != self.meta.get("sha256"):
+                self.frame = self.parse(body)
+                # Content hash doubles as the dataset version for derived indexes
+                self.frame.attrs["version"] = digest
+                self.meta = {"sha256": digest, "rows": len(self.frame), "synced_at": now}
+                changed = True
+            self.meta["etag"] = headers.get("ETag")
+            self.meta["last_modified"] = headers.get("Last-Modified")
+        self.meta["checked_at"] = now
+        self.meta["changed"] = changed
+        if changed:
+            self.meta["snapshot"] = self._write_snapshot()
+        self._write_meta()
+        return changed
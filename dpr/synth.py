@@ -0,0 +1,123 @@
+# dpr/synth.py — Synthetic DPR sheets for benchmarks and local testing
+#
+#   python -m dpr.synth --rows 100k -o sheet.csv
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from dpr.grid import format_dates
+
+# Milestones in the order a hop moves through them; the gap range (days) is
+# drawn between consecutive milestones.
+MILESTONES = [
+    ("HOP SR Date", (0, 0)),
+    ("ACTUAL HOP RFAI OFFERED DATE", (5, 40)),
+    ("Media Date", (0, 10)),
+    ("Survey Date", (2, 20)),
+    ("HOP MO DATE", (3, 25)),
+    ("HOP MATERIAL DISPATCH DATE", (2, 15)),
+    ("HOP MATERIAL DELIVERY DATE", (1, 10)),
+    ("HOP I&C DATE", (2, 30)),
+    ("Alignment Date", (0, 7)),
+    ("INTEGRATION DATE", (0, 10)),
+    ("PHY-AT OFFER DATE", (1, 10)),
+    ("PHY-AT ACCEPTANCE DATE", (1, 15)),
+    ("SOFT AT OFFER DATE", (0, 10)),
+    ("SOFT AT ACCEPTANCE DATE", (1, 15)),
+    ("HOP AT DATE", (1, 20)),
+]
+# Probability a hop got at least as far as each milestone
+REACH = [0.95, 0.80, 0.72, 0.66, 0.58, 0.52, 0.48, 0.42, 0.36, 0.34, 0.30, 0.26, 0.24, 0.20, 0.16]
+HOLE_RATE = 0.03  # reached but left blank in the sheet
+
+CIRCLES = (["AP", "TG", "KK"], [0.56, 0.40, 0.04])
+PRIORITIES = (["P0", "P1", ""], [0.30, 0.65, 0.05])
+RFI_STATUS = (["RFAI", "CCRFAI", "PRI", "Pending", ""], [0.55, 0.12, 0.10, 0.13, 0.10])
+FINAL_REMARKS = (["", "WIP", "Hold - ROW", "Hold - Material", "Done", "Dropped"], [0.45, 0.25, 0.08, 0.07, 0.13, 0.02])
+NOMINAL_AOP = (["AOP-24", "AOP-25", "AOP-26", ""], [0.25, 0.50, 0.20, 0.05])
+REMARKS = (["", "Site access pending", "Power issue", "LOS issue", "Material short", "Customer hold"],
+           [0.50, 0.12, 0.10, 0.10, 0.10, 0.08])
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "5M": 5_000_000}
+
+
+def parse_rows(text):
+    """'100k' / '1M' / '2500' → int."""
+    if text in SIZES:
+        return SIZES[text]
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def _choice(rng, n, spec):
+    values, p = spec
+    return np.asarray(values, dtype=object)[rng.choice(len(values), n, p=p)]
+
+
+def make_sheet(n, seed=0, start="2024-04-01", months=18):
+    """A DPR sheet of n hops as the CSV export would look (all cells text, blanks as '')."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    # Month skew: later months carry more scope
+    month_weights = np.linspace(1, 3, months)
+    month_idx = rng.choice(months, n, p=month_weights / month_weights.sum())
+    month_start = pd.date_range(start, periods=months, freq="MS")
+    month_labels = month_start.strftime("%b-%y").to_numpy(dtype=object)
+
+    sheet = {
+        "Circle": _choice(rng, n, CIRCLES),
+        "Month": month_labels[month_idx],
+        "Priority(P0/P1)": _choice(rng, n, PRIORITIES),
+        "Nominal Aop": _choice(rng, n, NOMINAL_AOP),
+        "HOP A-B": np.char.add(np.char.add("HOP", np.arange(n).astype(str)), "-B").astype(object),
+        "SITE ID A": np.char.add("SA", rng.integers(100000, 999999, n).astype(str)).astype(object),
+        "SITE ID B": np.char.add("SB", rng.integers(100000, 999999, n).astype(str)).astype(object),
+        "PLAN ID": np.where(rng.random(n) < 0.9, np.char.add("PL", rng.integers(1000, 99999, n).astype(str)), ""),
+    }
+
+    # Furthest milestone per hop, then cumulative day offsets from the month start
+    u = rng.random(n)
+    reached = (u[:, None] < np.asarray(REACH)[None, :])
+    day = (month_start.to_numpy()[month_idx] - np.datetime64(start)).astype("timedelta64[D]").astype(np.int64)
+    day = day + rng.integers(0, 28, n)
+    for i, (col, (lo, hi)) in enumerate(MILESTONES):
+        day = day + rng.integers(lo, hi + 1, n)
+        filled = reached[:, i] & (rng.random(n) >= HOLE_RATE)
+        dates = pd.Series(start + pd.to_timedelta(np.where(filled, day, 0), unit="D"))
+        dates[~filled] = pd.NaT
+        sheet[col] = format_dates(dates).fillna("").to_numpy()
+
+    at_done = reached[:, -1]
+    pri = at_done & (rng.random(n) < 0.04)
+    pri_day = pd.Series(start + pd.to_timedelta(day + rng.integers(1, 30, n), unit="D")).where(pri)
+    sheet["PRI OPEN DATE"] = format_dates(pri_day).fillna("").to_numpy()
+
+    rfi = _choice(rng, n, RFI_STATUS)
+    rfi[sheet["ACTUAL HOP RFAI OFFERED DATE"] == ""] = ""
+    sheet["RFI Status"] = rfi
+    sheet["VISIBLE IN NMS"] = np.where(reached[:, 9], np.where(rng.random(n) < 0.85, "YES", "NO"), "")
+    sheet["CIRCLE_REMARK_1"] = _choice(rng, n, REMARKS)
+    sheet["Final Remarks"] = _choice(rng, n, FINAL_REMARKS)
+    return pd.DataFrame(sheet)
+
+
+def make_csv(n, seed=0):
+    """CSV export bytes of a synthetic sheet."""
+    return make_sheet(n, seed).to_csv(index=False).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic DPR sheet CSV.")
+    parser.add_argument("--rows", default="10k", help="hop count, e.g. 10k, 100k, 1M, 5M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="dpr_synthetic.csv")
+    args = parser.parse_args(argv)
+    with open(args.output, "wb") as f:
+        f.write(make_csv(parse_rows(args.rows), args.seed))
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# tests/test_lru.py — The LRU behind the filter, cube, search and export caches
+from dpr.lru import LRU
+
+
+def test_evicts_least_recently_used():
+    lru = LRU(2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # "b" is now the oldest
+    lru.put("c", 3)
+    assert lru.get("b") is None and lru.get("a") == 1 and lru.get("c") == 3
+
+
+def test_caches_none_and_builds_once():
+    lru, calls = LRU(4), []
+    build = lambda: calls.append(1)  # returns None, as FilterIndex.rows does for "no filter"
+    assert lru.get_or_build("k", build) is None
+    assert lru.get_or_build("k", build) is None
+    assert len(calls) == 1
+
+
+def test_size_bound_keeps_newest():
+    lru = LRU(max_size=10)
+    lru.put("a", b"12345")
+    lru.put("b", b"123456")
+    assert lru.get("a") is None and lru.size == 6
+    lru.put("c", b"x" * 20)  # alone over the bound: still kept
+    assert len(lru) == 1 and lru.get("c") is not None and lru.size == 20
@@ -0,0 +1,26 @@
+# tests/test_schema.py — Typed ingest of edge-case sheets
+import pandas as pd
+
+from dpr.ingest import parse_sheet
+from dpr.schema import parse_dates
+
+
+def test_all_blank_date_column_parses_to_nat():
+    df = parse_sheet(b"Circle,HOP AT DATE\nAP,\nTG,\n")
+    assert len(df) == 2
+    assert df["HOP AT DATE"].dtype == "datetime64[ns]"
+    assert df["HOP AT DATE"].isna().all()
+
+
+def test_one_row_sheet():
+    df = parse_sheet(b"Circle,HOP AT DATE,PRI OPEN DATE\nAP,05-Mar-24,\n")
+    assert len(df) == 1
+    assert df["HOP AT DATE"].iloc[0] == pd.Timestamp("2024-03-05")
+    assert pd.isna(df["PRI OPEN DATE"].iloc[0])
+
+
+def test_blank_cells_among_dates():
+    s = pd.Series(["05-Mar-24", None, " ", "2024-03-06"], dtype=str, name="HOP AT DATE")
+    out = parse_dates(s)
+    assert out.tolist()[0] == pd.Timestamp("2024-03-05") and out.tolist()[3] == pd.Timestamp("2024-03-06")
+    assert out.iloc[1:3].isna().all() and out.name == "HOP AT DATE"
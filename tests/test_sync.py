@@ -0,0 +1,101 @@
+# tests/test_sync.py — SheetSync against a local HTTP stand-in for the Google Sheet export
+import hashlib
+import http.server
+import threading
+
+import pandas as pd
+import pytest
+
+from dpr.ingest import parse_sheet
+from dpr.sync import SheetSync
+from dpr.synth import make_csv
+
+BODY = make_csv(200, seed=1)
+
+
+class Sheet:
+    """What the stand-in serves, and what it was asked."""
+
+    def __init__(self, body, etag=True):
+        self.body = body
+        self.etag = etag
+        self.requests = []  # If-None-Match header of each GET (None if absent)
+        self.not_modified = 0
+
+
+@pytest.fixture
+def sheet():
+    state = Sheet(BODY)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            state.requests.append(self.headers.get("If-None-Match"))
+            etag = f'"{hashlib.md5(state.body).hexdigest()}"'
+            if state.etag and self.headers.get("If-None-Match") == etag:
+                state.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            if state.etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(state.body)))
+            self.end_headers()
+            self.wfile.write(state.body)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{server.server_port}/export.csv"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def counting_parse(calls):
+    def parse(body):
+        calls.append(len(body))
+        return parse_sheet(body)
+    return parse
+
+
+def test_first_fetch_parses_and_snapshots(sheet, tmp_path):
+    sync = SheetSync(url=sheet.url, cache_dir=str(tmp_path))
+    frame = sync.load()
+    assert len(frame) == 200
+    assert frame.attrs["version"] == hashlib.sha256(BODY).hexdigest()
+    assert sync.meta["changed"] and sync.meta["snapshot"]
+    assert (tmp_path / "sheet.parquet").exists() and (tmp_path / "sheet.json").exists()
+
+
+def test_unchanged_body_skips_parse(sheet, tmp_path):
+    sheet.etag = False  # no validators: the body hash is the only short-circuit
+    calls = []
+    sync = SheetSync(url=sheet.url, cache_dir=str(tmp_path), parse=counting_parse(calls))
+    first = sync.load()
+    assert sync.sync() is False
+    assert len(calls) == 1 and len(sheet.requests) == 2
+    assert sync.frame is first
+
+
+def test_etag_304_short_circuits(sheet, tmp_path):
+    calls = []
+    sync = SheetSync(url=sheet.url, cache_dir=str(tmp_path), parse=counting_parse(calls))
+    sync.load()
+    assert sync.sync() is False
+    assert sheet.requests[0] is None and sheet.requests[1] == sync.meta["etag"]
+    assert sheet.not_modified == 1 and len(calls) == 1
+
+
+def test_restart_reads_snapshot_with_same_dtypes(sheet, tmp_path):
+    synced = SheetSync(url=sheet.url, cache_dir=str(tmp_path)).load()
+    restarted = SheetSync(url=sheet.url, cache_dir=str(tmp_path))
+    assert restarted.load_snapshot()
+    assert len(sheet.requests) == 1  # no network on restart
+    assert restarted.frame.attrs["version"] == synced.attrs["version"]
+    assert restarted.frame.dtypes.to_dict() == synced.dtypes.to_dict()
+    pd.testing.assert_frame_equal(restarted.frame, synced)